@@ -5,12 +5,16 @@ from stacks.platform_stack import PlatformStack
 
 app = cdk.App()
 
+# POKE_REGION is shared with the agent runtime (see agentcore_runtime_deploy.py)
+# so the stack and the runtime always resolve the same region.
+region = os.getenv("POKE_REGION") or os.getenv("CDK_DEFAULT_REGION") or "us-east-2"
+
 PlatformStack(
     app,
     "PokePlatformStack",
     env=cdk.Environment(
         account=os.getenv("CDK_DEFAULT_ACCOUNT"),
-        region=os.getenv("CDK_DEFAULT_REGION", "us-east-2"),
+        region=region,
     ),
 )
 
@@ -1,13 +1,17 @@
+import json
+from types import MappingProxyType
+
 from constructs import Construct
 from aws_cdk import (
     Stack,
     CfnParameter,
     CfnOutput,
     Duration,
+    Size,
     aws_ec2 as ec2,
     aws_ecr as ecr,
     aws_ecs as ecs,
-    aws_ecs_patterns as ecs_patterns,
+    aws_elasticache as elasticache,
     aws_elasticloadbalancingv2 as elbv2,
     aws_events as events,
     aws_iam as iam,
@@ -17,12 +21,56 @@ from aws_cdk import (
     aws_secretsmanager as secretsmanager,
 )
 
+# Fargate sizes; override per deploy with `-c batch_task_size='{"cpu":512,...}'`
+# etc. The daily batch jobs and the Streamlit UI are I/O-bound, so the smallest
+# Fargate size is enough; the API keeps 0.5 vCPU because it serves ALB traffic.
+BATCH_TASK_SIZE = {"cpu": 256, "memory_limit_mib": 512}
+UI_TASK_SIZE = {"cpu": 256, "memory_limit_mib": 512}
+API_TASK_SIZE = {"cpu": 512, "memory_limit_mib": 1024}
+
+
 class PlatformStack(Stack):
     def __init__(self, scope: Construct, construct_id: str, **kwargs):
         super().__init__(scope, construct_id, **kwargs)
 
+        self._batch_task_size = self._task_size("batch_task_size", BATCH_TASK_SIZE)
+        ui_task_size = self._task_size("ui_task_size", UI_TASK_SIZE)
+        api_task_size = self._task_size("api_task_size", API_TASK_SIZE)
+
         vpc = ec2.Vpc(self, "Vpc", max_azs=2)
-        cluster = ecs.Cluster(self, "Cluster", vpc=vpc)
+        # Keep image pulls (ECR manifests + S3 layers), secret reads and log
+        # shipping on the AWS network instead of hairpinning through the NAT.
+        vpc.add_gateway_endpoint(
+            "S3Endpoint",
+            service=ec2.GatewayVpcEndpointAwsService.S3,
+            subnets=[ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS)],
+        )
+        endpoint_sg = ec2.SecurityGroup(
+            self,
+            "VpcEndpointSecurityGroup",
+            vpc=vpc,
+            description="HTTPS from tasks to VPC interface endpoints",
+            allow_all_outbound=False,
+        )
+        endpoint_sg.add_ingress_rule(
+            ec2.Peer.ipv4(vpc.vpc_cidr_block), ec2.Port.tcp(443), "Tasks to endpoints"
+        )
+        for endpoint_id, service in (
+            ("EcrApiEndpoint", ec2.InterfaceVpcEndpointAwsService.ECR),
+            ("EcrDockerEndpoint", ec2.InterfaceVpcEndpointAwsService.ECR_DOCKER),
+            ("SecretsManagerEndpoint", ec2.InterfaceVpcEndpointAwsService.SECRETS_MANAGER),
+            ("LogsEndpoint", ec2.InterfaceVpcEndpointAwsService.CLOUDWATCH_LOGS),
+        ):
+            vpc.add_interface_endpoint(
+                endpoint_id,
+                service=service,
+                private_dns_enabled=True,
+                security_groups=[endpoint_sg],
+                subnets=ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS),
+            )
+        cluster = ecs.Cluster(
+            self, "Cluster", vpc=vpc, enable_fargate_capacity_providers=True
+        )
 
         agentcore_runtime_arn = CfnParameter(
             self,
@@ -58,12 +106,27 @@ class PlatformStack(Stack):
         )
 
         # Postgres (RDS)
+        pg_engine = rds.DatabaseInstanceEngine.postgres(
+            version=rds.PostgresEngineVersion.VER_15_12
+        )
+        # The default t3.micro max_connections (~80) is too close to the 13:00
+        # fan-out; memory settings follow pgtune ratios (units: 8kB pages / kB).
+        pg_params = rds.ParameterGroup(
+            self,
+            "PgParams",
+            engine=pg_engine,
+            parameters={
+                "max_connections": "200",
+                "shared_buffers": "{DBInstanceClassMemory/32768}",
+                "effective_cache_size": "{DBInstanceClassMemory/16384}",
+                "work_mem": "8192",
+            },
+        )
         db = rds.DatabaseInstance(
             self,
             "Postgres",
-            engine=rds.DatabaseInstanceEngine.postgres(
-                version=rds.PostgresEngineVersion.VER_15_12
-            ),
+            engine=pg_engine,
+            parameter_group=pg_params,
             vpc=vpc,
             vpc_subnets=ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS),
             credentials=rds.Credentials.from_generated_secret("pokeadmin"),
@@ -76,37 +139,163 @@ class PlatformStack(Stack):
             deletion_protection=False,
         )
 
+        # RDS Proxy multiplexes the API + batch task connections onto a warm
+        # backend pool so cold starts don't exhaust t3.micro max_connections.
+        db_proxy = db.add_proxy(
+            "PgProxy",
+            secrets=[db.secret],
+            vpc=vpc,
+            vpc_subnets=ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS),
+            require_tls=True,
+            # Clients sign a 15-minute token with their task role instead of
+            # fetching the password from Secrets Manager at startup.
+            iam_auth=True,
+            borrow_timeout=Duration.seconds(30),
+            max_connections_percent=90,
+            max_idle_connections_percent=50,
+            session_pinning_filters=[],
+        )
+        db.connections.allow_default_port_from(db_proxy, "RDS Proxy to Postgres")
+
+        # Shared by every container and scheduled task; built once.
+        self._vpc = vpc
+        self._cluster = cluster
+        self._db_proxy = db_proxy
+        self._private_subnet_ids = vpc.select_subnets(
+            subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS
+        ).subnet_ids
+        # Single-node Redis for the API's valuation response cache; the
+        # strategy runner clears it after writing a new day.
+        redis_sg = ec2.SecurityGroup(
+            self,
+            "RedisSecurityGroup",
+            vpc=vpc,
+            description="API valuation cache",
+            allow_all_outbound=False,
+        )
+        redis_subnets = elasticache.CfnSubnetGroup(
+            self,
+            "RedisSubnetGroup",
+            description="Private subnets for the API valuation cache",
+            subnet_ids=self._private_subnet_ids,
+        )
+        redis_cache = elasticache.CfnCacheCluster(
+            self,
+            "Redis",
+            engine="redis",
+            cache_node_type="cache.t4g.micro",
+            num_cache_nodes=1,
+            cache_subnet_group_name=redis_subnets.ref,
+            vpc_security_group_ids=[redis_sg.security_group_id],
+        )
+        redis_url = (
+            f"redis://{redis_cache.attr_redis_endpoint_address}:"
+            f"{redis_cache.attr_redis_endpoint_port}/0"
+        )
+
+        # Read-only; containers always get a fresh `{**...}` copy.
+        self._db_env = MappingProxyType(
+            {
+                "DB_HOST": db_proxy.endpoint,
+                "DB_PORT": str(db.db_instance_endpoint_port),
+                "DB_NAME": "poke",
+                "DB_USER": "pokeadmin",
+                "DB_IAM_AUTH": "1",
+            }
+        )
+
+        # One execution role (image pull incl. SOCI index/layer range GETs,
+        # logs, secrets) for every task definition instead of one per task.
+        self._exec_role = iam.Role(
+            self,
+            "SharedTaskExec",
+            assumed_by=iam.ServicePrincipal("ecs-tasks.amazonaws.com"),
+            managed_policies=[
+                iam.ManagedPolicy.from_aws_managed_policy_name(
+                    "service-role/AmazonECSTaskExecutionRolePolicy"
+                )
+            ],
+        )
+        self._exec_role.add_to_policy(
+            iam.PolicyStatement(
+                actions=[
+                    "ecr:GetDownloadUrlForLayer",
+                    "ecr:BatchGetImage",
+                    "ecr:BatchCheckLayerAvailability",
+                ],
+                resources=[
+                    r.repository_arn
+                    for r in (
+                        api_repo,
+                        ui_repo,
+                        proposal_repo,
+                        strategy_repo,
+                        universe_repo,
+                        price_repo,
+                        export_repo,
+                    )
+                ],
+            )
+        )
+        # The batch tasks are emitted as L1 task definitions sharing one
+        # task role; task roles get rds-db:connect on the proxy for IAM auth.
+        self._batch_task_role = iam.Role(
+            self,
+            "BatchTaskRole",
+            assumed_by=iam.ServicePrincipal("ecs-tasks.amazonaws.com"),
+        )
+        db_proxy.grant_connect(self._batch_task_role, "pokeadmin")
+        # One role for every EventBridge -> ecs:RunTask target; its policy is
+        # attached once all scheduled task definitions exist.
+        self._events_role = iam.Role(
+            self,
+            "EventsInvokeEcsRole",
+            assumed_by=iam.ServicePrincipal("events.amazonaws.com"),
+        )
+        self._run_task_arns: list[str] = []
+        self._pass_roles: dict[str, iam.IRole] = {}
+
         # UI service + public ALB
         ui_log_group = logs.LogGroup(
             self,
             "UiLogGroup",
             retention=logs.RetentionDays.ONE_WEEK,
         )
-        ui_service = ecs_patterns.ApplicationLoadBalancedFargateService(
+        ui_task_def = ecs.FargateTaskDefinition(
+            self, "UiTaskDef", execution_role=self._exec_role, **ui_task_size
+        )
+        ui_container = ui_task_def.add_container(
+            "UiContainer",
+            image=self._image(ui_repo, "ui"),
+            port_mappings=[ecs.PortMapping(container_port=8501)],
+            environment={"API_BASE": "http://localhost"},
+            logging=ecs.LogDrivers.aws_logs(
+                stream_prefix="ui",
+                log_group=ui_log_group,
+                mode=ecs.AwsLogDriverMode.NON_BLOCKING,
+                max_buffer_size=Size.mebibytes(25),
+            ),
+        )
+        ui_service = ecs.FargateService(
             self,
             "UiService",
             cluster=cluster,
-            public_load_balancer=True,
+            task_definition=ui_task_def,
             desired_count=1,
-            cpu=512,
-            memory_limit_mib=1024,
-            listener_port=80,
-            task_image_options=ecs_patterns.ApplicationLoadBalancedTaskImageOptions(
-                image=ecs.ContainerImage.from_ecr_repository(ui_repo, tag="latest"),
-                container_port=8501,
-                environment={"API_BASE": "http://localhost"},
-                log_driver=ecs.LogDrivers.aws_logs(
-                    stream_prefix="ui",
-                    log_group=ui_log_group,
-                ),
-            ),
+            vpc_subnets=ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS),
             health_check_grace_period=Duration.seconds(60),
+            # 1.4.0+ is required for SOCI lazy loading (see scripts/soci_push.sh).
+            platform_version=ecs.FargatePlatformVersion.VERSION1_4,
         )
-        ui_service.load_balancer.set_attribute("idle_timeout.timeout_seconds", "120")
+
+        alb = elbv2.ApplicationLoadBalancer(self, "Alb", vpc=vpc, internet_facing=True)
+        alb.set_attribute("idle_timeout.timeout_seconds", "120")
+        listener = alb.add_listener("HttpListener", port=80, open=True)
+        listener.add_targets("UiTargets", port=8501, targets=[ui_service])
 
         # API service (behind same ALB via /api/*)
         api_task_def = ecs.FargateTaskDefinition(
-            self, "ApiTaskDef", cpu=512, memory_limit_mib=1024
+            self, "ApiTaskDef", execution_role=self._exec_role, **api_task_size
         )
         api_log_group = logs.LogGroup(
             self,
@@ -116,25 +305,24 @@ class PlatformStack(Stack):
 
         api_task_def.add_container(
             "ApiContainer",
-            image=ecs.ContainerImage.from_ecr_repository(api_repo, tag="latest"),
+            image=self._image(api_repo, "api"),
             port_mappings=[ecs.PortMapping(container_port=8000)],
             environment={
-                "DB_HOST": db.db_instance_endpoint_address,
-                "DB_PORT": str(db.db_instance_endpoint_port),
-                "DB_NAME": "poke",
-                "DB_USER": "pokeadmin",
+                **self._db_env,
                 "AGENTCORE_AGENT_RUNTIME_ARN": agentcore_runtime_arn.value_as_string,
+                "REDIS_URL": redis_url,
                 "AWS_REGION": Stack.of(self).region,
-            },
-            secrets={
-                "DB_PASSWORD": ecs.Secret.from_secrets_manager(db.secret, field="password"),
+                "POKE_REGION": Stack.of(self).region,
             },
             logging=ecs.LogDrivers.aws_logs(
                 stream_prefix="api",
                 log_group=api_log_group,
+                mode=ecs.AwsLogDriverMode.NON_BLOCKING,
+                max_buffer_size=Size.mebibytes(25),
             ),
         )
 
+        db_proxy.grant_connect(api_task_def.task_role, "pokeadmin")
         api_task_def.task_role.add_to_policy(
             iam.PolicyStatement(
                 actions=["bedrock-agentcore:InvokeAgentRuntime"],
@@ -153,195 +341,102 @@ class PlatformStack(Stack):
             desired_count=1,
             vpc_subnets=ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS),
             enable_execute_command=True,
+            platform_version=ecs.FargatePlatformVersion.VERSION1_4,
         )
 
-        proposal_log_group = logs.LogGroup(
-            self,
-            "ProposalGeneratorLogGroup",
-            retention=logs.RetentionDays.ONE_WEEK,
-        )
-        proposal_task_def = ecs.FargateTaskDefinition(
-            self, "ProposalGeneratorTaskDef", cpu=512, memory_limit_mib=1024
-        )
-        proposal_task_def.add_container(
-            "ProposalGeneratorContainer",
-            image=ecs.ContainerImage.from_ecr_repository(proposal_repo, tag="latest"),
-            environment={
-                "DB_HOST": db.db_instance_endpoint_address,
-                "DB_PORT": str(db.db_instance_endpoint_port),
-                "DB_NAME": "poke",
-                "DB_USER": "pokeadmin",
-            },
-            secrets={
-                "DB_PASSWORD": ecs.Secret.from_secrets_manager(db.secret, field="password"),
-            },
-            logging=ecs.LogDrivers.aws_logs(
-                stream_prefix="proposal-generator",
-                log_group=proposal_log_group,
-            ),
-        )
-        proposal_sg = ec2.SecurityGroup(
-            self,
-            "ProposalGeneratorSecurityGroup",
-            vpc=vpc,
-            description="Security group for proposal generator tasks",
-        )
-        strategy_log_group = logs.LogGroup(
-            self,
-            "StrategyRunnerLogGroup",
-            retention=logs.RetentionDays.ONE_WEEK,
-        )
-        strategy_task_def = ecs.FargateTaskDefinition(
-            self, "StrategyRunnerTaskDef", cpu=512, memory_limit_mib=1024
-        )
-        strategy_task_def.add_container(
-            "StrategyRunnerContainer",
-            image=ecs.ContainerImage.from_ecr_repository(strategy_repo, tag="latest"),
-            environment={
-                "DB_HOST": db.db_instance_endpoint_address,
-                "DB_PORT": str(db.db_instance_endpoint_port),
-                "DB_NAME": "poke",
-                "DB_USER": "pokeadmin",
-                "STRATEGY_NAME": "exp_smoothing_v1",
-                "STRATEGY_VERSION": "v1",
-            },
-            secrets={
-                "DB_PASSWORD": ecs.Secret.from_secrets_manager(db.secret, field="password"),
-            },
-            logging=ecs.LogDrivers.aws_logs(
-                stream_prefix="strategy-runner",
-                log_group=strategy_log_group,
-            ),
-        )
-        strategy_sg = ec2.SecurityGroup(
-            self,
-            "StrategyRunnerSecurityGroup",
-            vpc=vpc,
-            description="Security group for strategy runner tasks",
-        )
-        universe_log_group = logs.LogGroup(
-            self,
-            "UniverseUpdaterLogGroup",
-            retention=logs.RetentionDays.ONE_WEEK,
-        )
-        universe_task_def = ecs.FargateTaskDefinition(
-            self, "UniverseUpdaterTaskDef", cpu=512, memory_limit_mib=1024
-        )
         ptcg_secret = secretsmanager.Secret.from_secret_name_v2(
             self, "PtcgApiKey", "ptcg/api_key"
         )
-        universe_task_def.add_container(
-            "UniverseUpdaterContainer",
-            image=ecs.ContainerImage.from_ecr_repository(universe_repo, tag="latest"),
-            environment={
-                "DB_HOST": db.db_instance_endpoint_address,
-                "DB_PORT": str(db.db_instance_endpoint_port),
-                "DB_NAME": "poke",
-                "DB_USER": "pokeadmin",
-            },
-            secrets={
-                "DB_PASSWORD": ecs.Secret.from_secrets_manager(db.secret, field="password"),
-                "PTCG_API_KEY": ecs.Secret.from_secrets_manager(ptcg_secret),
-            },
-            logging=ecs.LogDrivers.aws_logs(
-                stream_prefix="universe-updater",
-                log_group=universe_log_group,
-            ),
-        )
-        universe_sg = ec2.SecurityGroup(
-            self,
-            "UniverseUpdaterSecurityGroup",
-            vpc=vpc,
-            description="Security group for universe updater tasks",
-        )
-        price_log_group = logs.LogGroup(
-            self,
-            "PriceExtractorLogGroup",
-            retention=logs.RetentionDays.ONE_WEEK,
-        )
-        price_task_def = ecs.FargateTaskDefinition(
-            self, "PriceExtractorTaskDef", cpu=512, memory_limit_mib=1024
+
+        # EventBridge Rules use UTC; 13:00 UTC == 08:00 America/New_York (standard time).
+        self._scheduled_task(
+            "ProposalGenerator",
+            proposal_repo,
+            schedule_expr="cron(0 13 * * ? *)",
+            stream_prefix="proposal-generator",
+            label="proposal generator",
+        )
+        # 13:02 UTC: staggered from the proposal generator so the two RunTask
+        # calls and cold image pulls don't land in the same second.
+        self._scheduled_task(
+            "PriceExtractor",
+            price_repo,
+            schedule_expr="cron(2 13 * * ? *)",
+            stream_prefix="price-extractor",
+            label="price extractor",
         )
-        price_task_def.add_container(
-            "PriceExtractorContainer",
-            image=ecs.ContainerImage.from_ecr_repository(price_repo, tag="latest"),
-            environment={
-                "DB_HOST": db.db_instance_endpoint_address,
-                "DB_PORT": str(db.db_instance_endpoint_port),
-                "DB_NAME": "poke",
-                "DB_USER": "pokeadmin",
-            },
-            secrets={
-                "DB_PASSWORD": ecs.Secret.from_secrets_manager(db.secret, field="password"),
+
+        # 13:07 UTC == 08:07 America/New_York (standard time); 5 min after prices.
+        _, strategy_sg = self._scheduled_task(
+            "StrategyRunner",
+            strategy_repo,
+            schedule_expr="cron(7 13 * * ? *)",
+            stream_prefix="strategy-runner",
+            label="strategy runner",
+            extra_env={
+                "STRATEGY_NAME": "exp_smoothing_v1",
+                "STRATEGY_VERSION": "v1",
+                "REDIS_URL": redis_url,
             },
-            logging=ecs.LogDrivers.aws_logs(
-                stream_prefix="price-extractor",
-                log_group=price_log_group,
-            ),
         )
-        price_sg = ec2.SecurityGroup(
-            self,
-            "PriceExtractorSecurityGroup",
-            vpc=vpc,
-            description="Security group for price extractor tasks",
+        # 12:55 UTC == 07:55 America/New_York (standard time).
+        self._scheduled_task(
+            "UniverseUpdater",
+            universe_repo,
+            schedule_expr="cron(55 12 * * ? *)",
+            stream_prefix="universe-updater",
+            label="universe updater",
+            extra_secrets={"PTCG_API_KEY": ptcg_secret},
         )
-        export_log_group = logs.LogGroup(
+        export_task_role = iam.Role(
             self,
-            "S3ExporterLogGroup",
-            retention=logs.RetentionDays.ONE_WEEK,
-        )
-        export_task_def = ecs.FargateTaskDefinition(
-            self, "S3ExporterTaskDef", cpu=512, memory_limit_mib=1024
-        )
-        export_task_def.add_container(
-            "S3ExporterContainer",
-            image=ecs.ContainerImage.from_ecr_repository(export_repo, tag="latest"),
-            environment={
-                "DB_HOST": db.db_instance_endpoint_address,
-                "DB_PORT": str(db.db_instance_endpoint_port),
-                "DB_NAME": "poke",
-                "DB_USER": "pokeadmin",
+            "S3ExporterTaskRole",
+            assumed_by=iam.ServicePrincipal("ecs-tasks.amazonaws.com"),
+        )
+        data_bucket.grant_write(export_task_role)
+        db_proxy.grant_connect(export_task_role, "pokeadmin")
+        # 13:12 UTC == 08:12 America/New_York (standard time).
+        self._scheduled_task(
+            "S3Exporter",
+            export_repo,
+            schedule_expr="cron(12 13 * * ? *)",
+            stream_prefix="s3-exporter",
+            label="S3 exporter",
+            # pandas/pyarrow Parquet writes need more headroom than 512 MiB.
+            task_size=api_task_size,
+            task_role=export_task_role,
+            extra_env={
                 "S3_BUCKET": data_bucket.bucket_name,
                 "S3_PREFIX": "snapshots",
             },
-            secrets={
-                "DB_PASSWORD": ecs.Secret.from_secrets_manager(db.secret, field="password"),
-            },
-            logging=ecs.LogDrivers.aws_logs(
-                stream_prefix="s3-exporter",
-                log_group=export_log_group,
-            ),
-        )
-        export_sg = ec2.SecurityGroup(
-            self,
-            "S3ExporterSecurityGroup",
-            vpc=vpc,
-            description="Security group for S3 exporter tasks",
         )
 
-        # Networking rules
-        db.connections.allow_default_port_from(api_service, "API to Postgres")
-        db.connections.allow_default_port_from(
-            proposal_sg, "Proposal generator to Postgres"
-        )
-        db.connections.allow_default_port_from(
-            strategy_sg, "Strategy runner to Postgres"
-        )
-        db.connections.allow_default_port_from(
-            universe_sg, "Universe updater to Postgres"
-        )
-        db.connections.allow_default_port_from(
-            price_sg, "Price extractor to Postgres"
+        self._events_role.add_to_policy(
+            iam.PolicyStatement(
+                actions=["ecs:RunTask"],
+                resources=self._run_task_arns,
+                conditions={"ArnLike": {"ecs:cluster": cluster.cluster_arn}},
+            )
         )
-        db.connections.allow_default_port_from(
-            export_sg, "S3 exporter to Postgres"
+        self._events_role.add_to_policy(
+            iam.PolicyStatement(
+                actions=["iam:PassRole"],
+                resources=[role.role_arn for role in self._pass_roles.values()],
+            )
         )
+
+        # Networking rules
+        db_port = ec2.Port.tcp(5432)
+        db_proxy.connections.allow_from(api_service, db_port, "API to Postgres")
         api_service.connections.allow_from(
-            ui_service.load_balancer, ec2.Port.tcp(8000), "ALB to API"
+            alb, ec2.Port.tcp(8000), "ALB to API"
         )
+        redis_port = ec2.Port.tcp(6379)
+        redis_sg.connections.allow_from(api_service, redis_port, "API to Redis")
+        redis_sg.connections.allow_from(strategy_sg, redis_port, "Strategy runner to Redis")
 
         # Path routing /api/* -> API
-        ui_service.listener.add_targets(
+        listener.add_targets(
             "ApiTargets",
             port=8000,
             targets=[api_service],
@@ -354,277 +449,158 @@ class PlatformStack(Stack):
             conditions=[elbv2.ListenerCondition.path_patterns(["/api/*"])],
         )
 
-        alb_dns = ui_service.load_balancer.load_balancer_dns_name
-        ui_service.task_definition.default_container.add_environment(
+        alb_dns = alb.load_balancer_dns_name
+        ui_container.add_environment(
             "API_BASE", f"http://{alb_dns}"
         )
 
-        proposal_rule_role = iam.Role(
-            self,
-            "ProposalGeneratorRuleRole",
-            assumed_by=iam.ServicePrincipal("events.amazonaws.com"),
-        )
-        proposal_rule_role.add_to_policy(
-            iam.PolicyStatement(
-                actions=["ecs:RunTask"],
-                resources=[proposal_task_def.task_definition_arn],
-                conditions={"ArnLike": {"ecs:cluster": cluster.cluster_arn}},
-            )
-        )
-        proposal_pass_role_arns = []
-        if proposal_task_def.execution_role:
-            proposal_pass_role_arns.append(proposal_task_def.execution_role.role_arn)
-        if proposal_task_def.task_role:
-            proposal_pass_role_arns.append(proposal_task_def.task_role.role_arn)
-        if proposal_pass_role_arns:
-            proposal_rule_role.add_to_policy(
-                iam.PolicyStatement(
-                    actions=["iam:PassRole"],
-                    resources=proposal_pass_role_arns,
-                )
-            )
+        CfnOutput(self, "AlbUrl", value=f"http://{alb_dns}")
+        CfnOutput(self, "ApiRepoUri", value=api_repo.repository_uri)
+        CfnOutput(self, "UiRepoUri", value=ui_repo.repository_uri)
+        CfnOutput(self, "ProposalGeneratorRepoUri", value=proposal_repo.repository_uri)
+        CfnOutput(self, "StrategyRunnerRepoUri", value=strategy_repo.repository_uri)
+        CfnOutput(self, "UniverseUpdaterRepoUri", value=universe_repo.repository_uri)
+        CfnOutput(self, "PriceExtractorRepoUri", value=price_repo.repository_uri)
+        CfnOutput(self, "S3ExporterRepoUri", value=export_repo.repository_uri)
+        CfnOutput(self, "DataBucketName", value=data_bucket.bucket_name)
+        CfnOutput(self, "DbEndpoint", value=db.db_instance_endpoint_address)
+        CfnOutput(self, "DbProxyEndpoint", value=db_proxy.endpoint)
 
-        proposal_subnets = vpc.select_subnets(
-            subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS
-        )
-        events.CfnRule(
-            self,
-            "ProposalGeneratorDailyRule",
-            # EventBridge Rules use UTC; 13:00 UTC == 08:00 America/New_York (standard time).
-            schedule_expression="cron(0 13 * * ? *)",
-            state="ENABLED",
-            targets=[
-                events.CfnRule.TargetProperty(
-                    arn=cluster.cluster_arn,
-                    id="ProposalGeneratorEcsTarget",
-                    role_arn=proposal_rule_role.role_arn,
-                    ecs_parameters=events.CfnRule.EcsParametersProperty(
-                        task_definition_arn=proposal_task_def.task_definition_arn,
-                        task_count=1,
-                        launch_type="FARGATE",
-                        network_configuration=events.CfnRule.NetworkConfigurationProperty(
-                            aws_vpc_configuration=events.CfnRule.AwsVpcConfigurationProperty(
-                                subnets=proposal_subnets.subnet_ids,
-                                security_groups=[proposal_sg.security_group_id],
-                                assign_public_ip="DISABLED",
-                            )
-                        ),
-                    ),
-                )
-            ],
-        )
-        strategy_rule_role = iam.Role(
-            self,
-            "StrategyRunnerRuleRole",
-            assumed_by=iam.ServicePrincipal("events.amazonaws.com"),
-        )
-        strategy_rule_role.add_to_policy(
-            iam.PolicyStatement(
-                actions=["ecs:RunTask"],
-                resources=[strategy_task_def.task_definition_arn],
-                conditions={"ArnLike": {"ecs:cluster": cluster.cluster_arn}},
-            )
-        )
-        strategy_pass_role_arns = []
-        if strategy_task_def.execution_role:
-            strategy_pass_role_arns.append(strategy_task_def.execution_role.role_arn)
-        if strategy_task_def.task_role:
-            strategy_pass_role_arns.append(strategy_task_def.task_role.role_arn)
-        if strategy_pass_role_arns:
-            strategy_rule_role.add_to_policy(
-                iam.PolicyStatement(
-                    actions=["iam:PassRole"],
-                    resources=strategy_pass_role_arns,
-                )
-            )
+    def _image(self, repo: ecr.IRepository, name: str) -> ecs.ContainerImage:
+        """Pin to `-c <name>_image_digest=sha256:...` when given, else `latest`.
 
-        events.CfnRule(
-            self,
-            "StrategyRunnerDailyRule",
-            # EventBridge Rules use UTC; 13:05 UTC == 08:05 America/New_York (standard time).
-            schedule_expression="cron(5 13 * * ? *)",
-            state="ENABLED",
-            targets=[
-                events.CfnRule.TargetProperty(
-                    arn=cluster.cluster_arn,
-                    id="StrategyRunnerEcsTarget",
-                    role_arn=strategy_rule_role.role_arn,
-                    ecs_parameters=events.CfnRule.EcsParametersProperty(
-                        task_definition_arn=strategy_task_def.task_definition_arn,
-                        task_count=1,
-                        launch_type="FARGATE",
-                        network_configuration=events.CfnRule.NetworkConfigurationProperty(
-                            aws_vpc_configuration=events.CfnRule.AwsVpcConfigurationProperty(
-                                subnets=proposal_subnets.subnet_ids,
-                                security_groups=[strategy_sg.security_group_id],
-                                assign_public_ip="DISABLED",
-                            )
-                        ),
-                    ),
-                )
-            ],
-        )
-        universe_rule_role = iam.Role(
+        A digest skips the tag -> manifest lookup on task start and keeps
+        layers cached on warm Fargate hosts valid across restarts.
+        """
+        digest = self.node.try_get_context(f"{name}_image_digest")
+        return ecs.ContainerImage.from_ecr_repository(repo, tag=digest or "latest")
+
+    def _image_uri(self, repo: ecr.IRepository, name: str) -> str:
+        """Same pinning as `_image`, as a plain URI for L1 task definitions."""
+        digest = self.node.try_get_context(f"{name}_image_digest")
+        if digest:
+            return f"{repo.repository_uri}@{digest}"
+        return f"{repo.repository_uri}:latest"
+
+    def _task_size(self, key: str, default: dict) -> dict:
+        """`cpu`/`memory_limit_mib` for a task, from CDK context when set."""
+        override = self.node.try_get_context(key)
+        if isinstance(override, str):
+            override = json.loads(override)
+        return {**default, **(override or {})}
+
+    def _scheduled_task(
+        self,
+        id_: str,
+        repo: ecr.IRepository,
+        *,
+        schedule_expr: str,
+        stream_prefix: str,
+        label: str,
+        task_size: dict | None = None,
+        task_role: iam.IRole | None = None,
+        extra_env: dict | None = None,
+        extra_secrets: dict | None = None,
+    ) -> tuple[ecs.CfnTaskDefinition, ec2.SecurityGroup]:
+        """Daily Fargate batch task: log group, task def, SG and ``{id_}DailyRule``.
+
+        ``extra_secrets`` maps env names to whole Secrets Manager secrets.
+        """
+        log_group = logs.LogGroup(
             self,
-            "UniverseUpdaterRuleRole",
-            assumed_by=iam.ServicePrincipal("events.amazonaws.com"),
+            f"{id_}LogGroup",
+            retention=logs.RetentionDays.THREE_DAYS,
         )
-        universe_rule_role.add_to_policy(
-            iam.PolicyStatement(
-                actions=["ecs:RunTask"],
-                resources=[universe_task_def.task_definition_arn],
-                conditions={"ArnLike": {"ecs:cluster": cluster.cluster_arn}},
-            )
-        )
-        universe_pass_role_arns = []
-        if universe_task_def.execution_role:
-            universe_pass_role_arns.append(universe_task_def.execution_role.role_arn)
-        if universe_task_def.task_role:
-            universe_pass_role_arns.append(universe_task_def.task_role.role_arn)
-        if universe_pass_role_arns:
-            universe_rule_role.add_to_policy(
-                iam.PolicyStatement(
-                    actions=["iam:PassRole"],
-                    resources=universe_pass_role_arns,
-                )
-            )
+        exec_role = self._exec_role
+        task_role = task_role or self._batch_task_role
 
-        events.CfnRule(
+        secrets = {}
+        for env_name, secret in (extra_secrets or {}).items():
+            secret.grant_read(exec_role)
+            secrets[env_name] = secret.secret_arn
+
+        size = task_size or self._batch_task_size
+        task_def = ecs.CfnTaskDefinition(
             self,
-            "UniverseUpdaterDailyRule",
-            # EventBridge Rules use UTC; 12:55 UTC == 07:55 America/New_York (standard time).
-            schedule_expression="cron(55 12 * * ? *)",
-            state="ENABLED",
-            targets=[
-                events.CfnRule.TargetProperty(
-                    arn=cluster.cluster_arn,
-                    id="UniverseUpdaterEcsTarget",
-                    role_arn=universe_rule_role.role_arn,
-                    ecs_parameters=events.CfnRule.EcsParametersProperty(
-                        task_definition_arn=universe_task_def.task_definition_arn,
-                        task_count=1,
-                        launch_type="FARGATE",
-                        network_configuration=events.CfnRule.NetworkConfigurationProperty(
-                            aws_vpc_configuration=events.CfnRule.AwsVpcConfigurationProperty(
-                                subnets=proposal_subnets.subnet_ids,
-                                security_groups=[universe_sg.security_group_id],
-                                assign_public_ip="DISABLED",
-                            )
-                        ),
+            f"{id_}TaskDef",
+            requires_compatibilities=["FARGATE"],
+            network_mode="awsvpc",
+            cpu=str(size["cpu"]),
+            memory=str(size["memory_limit_mib"]),
+            execution_role_arn=exec_role.role_arn,
+            task_role_arn=task_role.role_arn,
+            container_definitions=[
+                ecs.CfnTaskDefinition.ContainerDefinitionProperty(
+                    name=f"{id_}Container",
+                    image=self._image_uri(repo, stream_prefix.replace("-", "_")),
+                    essential=True,
+                    environment=[
+                        ecs.CfnTaskDefinition.KeyValuePairProperty(name=k, value=v)
+                        for k, v in {**self._db_env, **(extra_env or {})}.items()
+                    ],
+                    secrets=[
+                        ecs.CfnTaskDefinition.SecretProperty(name=k, value_from=v)
+                        for k, v in secrets.items()
+                    ],
+                    log_configuration=ecs.CfnTaskDefinition.LogConfigurationProperty(
+                        log_driver="awslogs",
+                        options={
+                            "awslogs-group": log_group.log_group_name,
+                            "awslogs-region": self.region,
+                            "awslogs-stream-prefix": stream_prefix,
+                            # Buffer stdout instead of blocking the job on PutLogEvents.
+                            "mode": "non-blocking",
+                            "max-buffer-size": "25m",
+                        },
                     ),
                 )
             ],
         )
-        price_rule_role = iam.Role(
+        sg = ec2.SecurityGroup(
             self,
-            "PriceExtractorRuleRole",
-            assumed_by=iam.ServicePrincipal("events.amazonaws.com"),
+            f"{id_}SecurityGroup",
+            vpc=self._vpc,
+            description=f"Security group for {label} tasks",
         )
-        price_rule_role.add_to_policy(
-            iam.PolicyStatement(
-                actions=["ecs:RunTask"],
-                resources=[price_task_def.task_definition_arn],
-                conditions={"ArnLike": {"ecs:cluster": cluster.cluster_arn}},
-            )
+        self._db_proxy.connections.allow_from(
+            sg, ec2.Port.tcp(5432), f"{label[:1].upper()}{label[1:]} to Postgres"
         )
-        price_pass_role_arns = []
-        if price_task_def.execution_role:
-            price_pass_role_arns.append(price_task_def.execution_role.role_arn)
-        if price_task_def.task_role:
-            price_pass_role_arns.append(price_task_def.task_role.role_arn)
-        if price_pass_role_arns:
-            price_rule_role.add_to_policy(
-                iam.PolicyStatement(
-                    actions=["iam:PassRole"],
-                    resources=price_pass_role_arns,
-                )
-            )
 
-        events.CfnRule(
-            self,
-            "PriceExtractorDailyRule",
-            # EventBridge Rules use UTC; 13:00 UTC == 08:00 America/New_York (standard time).
-            schedule_expression="cron(0 13 * * ? *)",
-            state="ENABLED",
-            targets=[
-                events.CfnRule.TargetProperty(
-                    arn=cluster.cluster_arn,
-                    id="PriceExtractorEcsTarget",
-                    role_arn=price_rule_role.role_arn,
-                    ecs_parameters=events.CfnRule.EcsParametersProperty(
-                        task_definition_arn=price_task_def.task_definition_arn,
-                        task_count=1,
-                        launch_type="FARGATE",
-                        network_configuration=events.CfnRule.NetworkConfigurationProperty(
-                            aws_vpc_configuration=events.CfnRule.AwsVpcConfigurationProperty(
-                                subnets=proposal_subnets.subnet_ids,
-                                security_groups=[price_sg.security_group_id],
-                                assign_public_ip="DISABLED",
-                            )
-                        ),
-                    ),
-                )
-            ],
-        )
+        self._run_task_arns.append(task_def.ref)
+        for role in (exec_role, task_role):
+            self._pass_roles[role.node.path] = role
 
-        export_rule_role = iam.Role(
-            self,
-            "S3ExporterRuleRole",
-            assumed_by=iam.ServicePrincipal("events.amazonaws.com"),
-        )
-        export_rule_role.add_to_policy(
-            iam.PolicyStatement(
-                actions=["ecs:RunTask"],
-                resources=[export_task_def.task_definition_arn],
-                conditions={"ArnLike": {"ecs:cluster": cluster.cluster_arn}},
-            )
+        target = events.CfnRule.TargetProperty(
+            arn=self._cluster.cluster_arn,
+            id=f"{id_}EcsTarget",
+            role_arn=self._events_role.role_arn,
+            ecs_parameters=events.CfnRule.EcsParametersProperty(
+                task_definition_arn=task_def.ref,
+                task_count=1,
+                # On-demand FARGATE only (no SPOT placement); mutually
+                # exclusive with launch_type.
+                capacity_provider_strategy=[
+                    events.CfnRule.CapacityProviderStrategyItemProperty(
+                        capacity_provider="FARGATE", weight=1, base=1
+                    )
+                ],
+                platform_version="1.4.0",
+                enable_ecs_managed_tags=True,
+                propagate_tags="TASK_DEFINITION",
+                network_configuration=events.CfnRule.NetworkConfigurationProperty(
+                    aws_vpc_configuration=events.CfnRule.AwsVpcConfigurationProperty(
+                        subnets=self._private_subnet_ids,
+                        security_groups=[sg.security_group_id],
+                        assign_public_ip="DISABLED",
+                    )
+                ),
+            ),
         )
-        export_pass_role_arns = []
-        if export_task_def.execution_role:
-            export_pass_role_arns.append(export_task_def.execution_role.role_arn)
-        if export_task_def.task_role:
-            export_pass_role_arns.append(export_task_def.task_role.role_arn)
-        if export_pass_role_arns:
-            export_rule_role.add_to_policy(
-                iam.PolicyStatement(
-                    actions=["iam:PassRole"],
-                    resources=export_pass_role_arns,
-                )
-            )
-        data_bucket.grant_write(export_task_def.task_role)
-
         events.CfnRule(
             self,
-            "S3ExporterDailyRule",
-            # EventBridge Rules use UTC; 13:10 UTC == 08:10 America/New_York (standard time).
-            schedule_expression="cron(10 13 * * ? *)",
+            f"{id_}DailyRule",
+            schedule_expression=schedule_expr,
             state="ENABLED",
-            targets=[
-                events.CfnRule.TargetProperty(
-                    arn=cluster.cluster_arn,
-                    id="S3ExporterEcsTarget",
-                    role_arn=export_rule_role.role_arn,
-                    ecs_parameters=events.CfnRule.EcsParametersProperty(
-                        task_definition_arn=export_task_def.task_definition_arn,
-                        task_count=1,
-                        launch_type="FARGATE",
-                        network_configuration=events.CfnRule.NetworkConfigurationProperty(
-                            aws_vpc_configuration=events.CfnRule.AwsVpcConfigurationProperty(
-                                subnets=proposal_subnets.subnet_ids,
-                                security_groups=[export_sg.security_group_id],
-                                assign_public_ip="DISABLED",
-                            )
-                        ),
-                    ),
-                )
-            ],
+            targets=[target],
         )
-
-        CfnOutput(self, "AlbUrl", value=f"http://{alb_dns}")
-        CfnOutput(self, "ApiRepoUri", value=api_repo.repository_uri)
-        CfnOutput(self, "UiRepoUri", value=ui_repo.repository_uri)
-        CfnOutput(self, "UniverseUpdaterRepoUri", value=universe_repo.repository_uri)
-        CfnOutput(self, "PriceExtractorRepoUri", value=price_repo.repository_uri)
-        CfnOutput(self, "S3ExporterRepoUri", value=export_repo.repository_uri)
-        CfnOutput(self, "DataBucketName", value=data_bucket.bucket_name)
-        CfnOutput(self, "DbEndpoint", value=db.db_instance_endpoint_address)
+        return task_def, sg
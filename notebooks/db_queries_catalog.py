@@ -3,28 +3,44 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List
+from types import MappingProxyType
+from typing import Final, Mapping, Tuple
+
+__all__ = [
+    "JoinKey",
+    "QueryInfo",
+    "TABLES",
+    "JOIN_KEYS",
+    "QUERIES",
+    "QUERY_BY_NAME",
+    "prepare_all",
+]
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class JoinKey:
     left: str
     right: str
     description: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class QueryInfo:
     name: str
     sql: str
     description: str
-    join_keys: List[str]
+    join_keys: Tuple[str, ...] = ()
+
+    @property
+    def prepared_name(self) -> str:
+        """Server-side prepared statement name used by `prepare_all`."""
+        return f"catalog_{self.name}"
 
 
-TABLES = {
+_TABLES = {
     "card_metadata": {
         "description": "Daily snapshots of Pokemon card metadata from the PTCG API.",
-        "columns": [
+        "columns": (
             "asset_id",
             "snapshot_date",
             "ptcg_card_id",
@@ -38,11 +54,11 @@ TABLES = {
             "images_json",
             "raw_json",
             "updated_ts",
-        ],
+        ),
     },
     "tcgplayer_price_snapshot": {
         "description": "Daily price snapshots from TCGplayer per asset/variant.",
-        "columns": [
+        "columns": (
             "snapshot_date",
             "snapshot_ts",
             "asset_id",
@@ -65,11 +81,11 @@ TABLES = {
             "url",
             "source_updated_at",
             "extra",
-        ],
+        ),
     },
     "cardmarket_price_snapshot": {
         "description": "Daily price snapshots from Cardmarket per asset/variant.",
-        "columns": [
+        "columns": (
             "snapshot_date",
             "snapshot_ts",
             "asset_id",
@@ -92,11 +108,11 @@ TABLES = {
             "url",
             "source_updated_at",
             "extra",
-        ],
+        ),
     },
     "valuation_daily": {
         "description": "Daily valuation outputs from strategies.",
-        "columns": [
+        "columns": (
             "val_date",
             "asset_id",
             "market_price",
@@ -110,73 +126,121 @@ TABLES = {
             "strategy_version",
             "run_id",
             "ts_created",
-        ],
+        ),
     },
 }
 
+TABLES: Final[Mapping[str, Mapping[str, object]]] = MappingProxyType(
+    {name: MappingProxyType(info) for name, info in _TABLES.items()}
+)
+del _TABLES
 
-JOIN_KEYS = []
 
+JOIN_KEYS: Final[Tuple[JoinKey, ...]] = ()
 
-QUERIES = [
+
+QUERIES: Final[Tuple[QueryInfo, ...]] = (
     QueryInfo(
         name="card_metadata_count",
         sql="SELECT COUNT(*) AS card_metadata_snapshot_count FROM card_metadata;",
         description="Total number of card metadata snapshots.",
-        join_keys=[],
     ),
     QueryInfo(
         name="latest_metadata_snapshot",
         sql="SELECT MAX(snapshot_date) AS latest_snapshot_date FROM card_metadata;",
         description="Most recent snapshot date for metadata.",
-        join_keys=[],
     ),
     QueryInfo(
         name="recent_cards",
         sql=(
+            # Emulated loose index scan: one probe per asset on
+            # cm_asset_latest (asset_id, snapshot_date DESC, updated_ts DESC)
+            # INCLUDE (name, artist, rarity, set_name) instead of sorting the whole table.
+            "WITH RECURSIVE t AS ("
+            "  (SELECT asset_id, name, set_name, rarity, snapshot_date, updated_ts "
+            "   FROM card_metadata "
+            "   ORDER BY asset_id, snapshot_date DESC, updated_ts DESC LIMIT 1) "
+            "  UNION ALL "
+            "  SELECT c.asset_id, c.name, c.set_name, c.rarity, c.snapshot_date, c.updated_ts "
+            "  FROM t CROSS JOIN LATERAL ("
+            "    SELECT asset_id, name, set_name, rarity, snapshot_date, updated_ts "
+            "    FROM card_metadata "
+            "    WHERE asset_id > t.asset_id "
+            "    ORDER BY asset_id, snapshot_date DESC, updated_ts DESC LIMIT 1"
+            "  ) c"
+            ") "
             "SELECT asset_id, name, set_name, rarity, snapshot_date, updated_ts "
-            "FROM ("
-            "  SELECT DISTINCT ON (asset_id) asset_id, name, set_name, rarity, snapshot_date, updated_ts "
-            "  FROM card_metadata "
-            "  ORDER BY asset_id, snapshot_date DESC, updated_ts DESC"
-            ") t "
+            "FROM t "
             "ORDER BY snapshot_date DESC, updated_ts DESC LIMIT 50;"
         ),
         description="Sample of recently updated cards (latest snapshot per asset).",
-        join_keys=[],
     ),
     QueryInfo(
         name="tcgplayer_latest_prices",
         sql=(
-            "SELECT asset_id, variant, market, low, mid, high, snapshot_date "
+            "SELECT DISTINCT ON (asset_id, variant) "
+            "asset_id, variant, market, low, mid, high, snapshot_date "
             "FROM tcgplayer_price_snapshot "
-            "ORDER BY snapshot_date DESC LIMIT 50;"
+            "ORDER BY asset_id, variant, snapshot_date DESC, snapshot_ts DESC LIMIT 50;"
+        ),
+        description=(
+            "Latest TCGplayer price per (asset_id, variant). Needs "
+            "CREATE INDEX ON tcgplayer_price_snapshot(asset_id, variant, snapshot_date DESC); "
+            "(idx_tcgplayer_price_asset_variant_date, created by price_extractor)."
         ),
-        description="Latest TCGplayer price snapshots.",
-        join_keys=[],
     ),
     QueryInfo(
         name="cardmarket_latest_prices",
         sql=(
-            "SELECT asset_id, variant, avg1, avg7, avg30, trend_price, snapshot_date "
+            "SELECT DISTINCT ON (asset_id, variant) "
+            "asset_id, variant, avg1, avg7, avg30, trend_price, snapshot_date "
             "FROM cardmarket_price_snapshot "
-            "ORDER BY snapshot_date DESC LIMIT 50;"
+            "ORDER BY asset_id, variant, snapshot_date DESC, snapshot_ts DESC LIMIT 50;"
+        ),
+        description=(
+            "Latest Cardmarket price per (asset_id, variant). Needs "
+            "CREATE INDEX ON cardmarket_price_snapshot(asset_id, variant, snapshot_date DESC); "
+            "(idx_cardmarket_price_asset_variant_date, created by price_extractor)."
         ),
-        description="Latest Cardmarket price snapshots.",
-        join_keys=[],
     ),
     QueryInfo(
         name="latest_valuations",
         sql=(
-            "WITH latest_val AS (SELECT MAX(val_date) AS val_date FROM valuation_daily) "
             "SELECT val_date, asset_id, market_price, forecast_price, gap_pct, confidence "
-            "FROM valuation_daily WHERE val_date = (SELECT val_date FROM latest_val) "
+            "FROM valuation_daily "
+            "WHERE val_date = (SELECT MAX(val_date) FROM valuation_daily) "
             "ORDER BY gap_pct DESC LIMIT 50;"
         ),
-        description="Latest valuation outputs.",
-        join_keys=[],
+        description=(
+            "Latest valuation outputs. Needs an index on (val_date, gap_pct) for a "
+            "single MAX probe plus a ~50-row range scan; idx_valuation_daily_gap "
+            "(created by strategy_runner) serves it via a backward scan, equivalent to "
+            "CREATE INDEX valuation_daily_date_gap_idx ON valuation_daily(val_date DESC, gap_pct DESC)."
+        ),
     ),
-]
+)
+
+QUERY_BY_NAME: Final[Mapping[str, QueryInfo]] = MappingProxyType(
+    {q.name: q for q in QUERIES}
+)
+
+
+if __debug__:
+    assert len(QUERY_BY_NAME) == len(QUERIES), "duplicate query names in QUERIES"
+    try:
+        import sqlglot
+    except ImportError:  # optional; only used to fail fast on malformed SQL
+        sqlglot = None
+    if sqlglot is not None:
+        for _q in QUERIES:
+            sqlglot.parse_one(_q.sql, dialect="postgres")
+
+
+def prepare_all(conn) -> None:
+    """PREPARE every catalog query on `conn`; run them with `EXECUTE <prepared_name>`."""
+    with conn.cursor() as cur:
+        for q in QUERIES:
+            cur.execute(f"PREPARE {q.prepared_name} AS {q.sql.rstrip().rstrip(';')}")
 
 
 def example_usage() -> None:
@@ -184,5 +248,8 @@ def example_usage() -> None:
     # from scripts.db_notebook_helpers import read_sql
     # from notebooks.db_explore import REGION, SECRET_ARN
     # df = read_sql(QUERIES[0].sql, region=REGION, secret_arn=SECRET_ARN)
+    # or, via the prepared statement on a reused connection:
+    # from scripts.db_notebook_helpers import read_query
+    # df = read_query("latest_valuations", region=REGION, secret_arn=SECRET_ARN)
     # print(df.head())
-    raise SystemExit("Import this module and use QUERIES with read_sql().")
+    raise SystemExit("Import this module and use QUERIES with read_sql()/read_query().")
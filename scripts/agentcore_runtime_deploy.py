@@ -2,59 +2,165 @@ from __future__ import annotations
 
 import argparse
 import base64
+import functools
 import hashlib
 import hmac
 import json
 import os
+import random
 import shutil
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional
+from string import Template
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+# boto3, yaml and the starter toolkit are imported where they're used: together
+# they add about a second of startup that `--help` and `status` don't need.
+if TYPE_CHECKING:
+    from bedrock_agentcore_starter_toolkit import Runtime
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+
+def _dumps(obj, *, pretty: bool = False, sort_keys: bool = False) -> str:
+    """Serialize with orjson when available; the fallback matches its output."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=str, option=option).decode()
+    if pretty:
+        return json.dumps(obj, indent=2, default=str, sort_keys=sort_keys, ensure_ascii=False)
+    return json.dumps(
+        obj, separators=(",", ":"), default=str, sort_keys=sort_keys, ensure_ascii=False
+    )
 
-import boto3
-import yaml
-from bedrock_agentcore_starter_toolkit import Runtime
 
 SSM_PREFIX = os.getenv("AGENTCORE_SSM_PREFIX", "/app/poke-platform/agentcore")
 DEFAULT_USER = os.getenv("AGENTCORE_TEST_USER", "testuser")
 DEFAULT_PASSWORD = os.getenv("AGENTCORE_TEST_PASSWORD", "MyPassword123!")
+# Reuse the cached access token until it is this close to expiry.
+TOKEN_REFRESH_WINDOW_S = 120
+
+
+# One session and one client per service for the whole run; each
+# boto3.client() call otherwise reloads the service model.
+@functools.lru_cache(maxsize=None)
+def _session():
+    import boto3
+
+    return boto3.session.Session()
+
+
+@functools.lru_cache(maxsize=None)
+def _client(service: str):
+    return _session().client(service)
+
+
+def _region() -> Optional[str]:
+    return _session().region_name
+
+
+@functools.lru_cache(maxsize=None)
+def _cognito():
+    # Created on first use: runs that reuse a cached bearer token never pay
+    # for loading the cognito-idp service model. Adaptive retries soak up
+    # Cognito TooManyRequestsException under concurrent deploys.
+    from botocore.config import Config
+
+    return _session().client(
+        "cognito-idp",
+        region_name=_region(),
+        config=Config(retries={"mode": "adaptive", "max_attempts": 8}),
+    )
 
 
 def _ssm_name(suffix: str) -> str:
     return f"{SSM_PREFIX}/{suffix}"
 
 
+# Values seen in (or written to) SSM during this run, keyed by name; None means
+# "known to be missing". Lets put_ssm_parameter skip unchanged writes without
+# an extra read when the value was already fetched.
+_SSM_SEEN: Dict[str, Optional[str]] = {}
+
+
 def get_ssm_parameter(name: str, with_decryption: bool = True) -> Optional[str]:
-    ssm = boto3.client("ssm")
+    ssm = _client("ssm")
     try:
         response = ssm.get_parameter(Name=name, WithDecryption=with_decryption)
     except ssm.exceptions.ParameterNotFound:
+        _SSM_SEEN[name] = None
         return None
-    return response["Parameter"]["Value"]
+    param = response["Parameter"]
+    if with_decryption or param["Type"] != "SecureString":
+        _SSM_SEEN[name] = param["Value"]
+    return param["Value"]
+
+
+def get_ssm_parameters(names: List[str]) -> Dict[str, str]:
+    """Fetch up to 10 parameters in one call; missing names are omitted."""
+    response = _client("ssm").get_parameters(Names=names, WithDecryption=True)
+    found = {p["Name"]: p["Value"] for p in response["Parameters"]}
+    for name in names:
+        _SSM_SEEN[name] = found.get(name)
+    return found
 
 
 def put_ssm_parameter(name: str, value: str, secure: bool = False) -> None:
-    ssm = boto3.client("ssm")
-    ssm.put_parameter(
+    # PutParameter has a low account-wide TPS; steady-state reruns write the
+    # same values, so only write when the value actually changed.
+    if name not in _SSM_SEEN:
+        get_ssm_parameter(name, with_decryption=secure)
+    if _SSM_SEEN.get(name) == value:
+        return
+    _client("ssm").put_parameter(
         Name=name,
         Value=value,
         Type="SecureString" if secure else "String",
         Overwrite=True,
     )
+    _SSM_SEEN[name] = value
 
 
+@functools.lru_cache(maxsize=16)
 def _secret_hash(username: str, client_id: str, client_secret: str) -> str:
     message = bytes(username + client_id, "utf-8")
     key = bytes(client_secret, "utf-8")
     return base64.b64encode(hmac.new(key, message, hashlib.sha256).digest()).decode()
 
 
+def _store_bearer_token(auth_result: Dict) -> str:
+    token = auth_result["AccessToken"]
+    put_ssm_parameter(_ssm_name("bearer_token"), token, secure=True)
+    put_ssm_parameter(
+        _ssm_name("bearer_token_exp"), str(int(time.time() + auth_result["ExpiresIn"]))
+    )
+    return token
+
+
+def _cached_bearer_token() -> Optional[str]:
+    params = get_ssm_parameters([_ssm_name("bearer_token"), _ssm_name("bearer_token_exp")])
+    exp = params.get(_ssm_name("bearer_token_exp"))
+    if not exp or float(exp) <= time.time() + TOKEN_REFRESH_WINDOW_S:
+        return None
+    return params.get(_ssm_name("bearer_token"))
+
+
 def reauthenticate_user(client_id: str, client_secret: str) -> str:
-    region = boto3.session.Session().region_name
-    cognito_client = boto3.client("cognito-idp", region_name=region)
+    cached = _cached_bearer_token()
+    if cached:
+        return cached
+
     secret_hash = _secret_hash(DEFAULT_USER, client_id, client_secret)
-    auth_response = cognito_client.initiate_auth(
+    auth_response = _cognito().initiate_auth(
         ClientId=client_id,
         AuthFlow="USER_PASSWORD_AUTH",
         AuthParameters={
@@ -63,17 +169,24 @@ def reauthenticate_user(client_id: str, client_secret: str) -> str:
             "SECRET_HASH": secret_hash,
         },
     )
-    return auth_response["AuthenticationResult"]["AccessToken"]
+    return _store_bearer_token(auth_response["AuthenticationResult"])
 
 
 def get_or_create_cognito_pool(refresh_token: bool = False) -> Dict[str, str]:
-    region = boto3.session.Session().region_name
-    cognito_client = boto3.client("cognito-idp", region_name=region)
-
-    pool_id = get_ssm_parameter(_ssm_name("pool_id"), with_decryption=False)
-    client_id = get_ssm_parameter(_ssm_name("client_id"), with_decryption=False)
-    client_secret = get_ssm_parameter(_ssm_name("client_secret"))
-    discovery_url = get_ssm_parameter(_ssm_name("cognito_discovery_url"), with_decryption=False)
+    region = _region()
+
+    params = get_ssm_parameters(
+        [
+            _ssm_name("pool_id"),
+            _ssm_name("client_id"),
+            _ssm_name("client_secret"),
+            _ssm_name("cognito_discovery_url"),
+        ]
+    )
+    pool_id = params.get(_ssm_name("pool_id"))
+    client_id = params.get(_ssm_name("client_id"))
+    client_secret = params.get(_ssm_name("client_secret"))
+    discovery_url = params.get(_ssm_name("cognito_discovery_url"))
 
     if pool_id and client_id and client_secret and discovery_url:
         bearer_token = (
@@ -87,30 +200,38 @@ def get_or_create_cognito_pool(refresh_token: bool = False) -> Dict[str, str]:
             "bearer_token": bearer_token,
         }
 
+    cognito_client = _cognito()
     user_pool_response = cognito_client.create_user_pool(
         PoolName="AgentCoreRuntimePool", Policies={"PasswordPolicy": {"MinimumLength": 8}}
     )
     pool_id = user_pool_response["UserPool"]["Id"]
 
-    app_client_response = cognito_client.create_user_pool_client(
-        UserPoolId=pool_id,
-        ClientName="AgentCoreRuntimePoolClient",
-        GenerateSecret=True,
-        ExplicitAuthFlows=[
-            "ALLOW_USER_PASSWORD_AUTH",
-            "ALLOW_REFRESH_TOKEN_AUTH",
-            "ALLOW_USER_SRP_AUTH",
-        ],
-    )
+    # The app client and the test user only depend on the pool, so create
+    # them concurrently (boto3 clients are thread-safe).
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        app_client_future = pool.submit(
+            cognito_client.create_user_pool_client,
+            UserPoolId=pool_id,
+            ClientName="AgentCoreRuntimePoolClient",
+            GenerateSecret=True,
+            ExplicitAuthFlows=[
+                "ALLOW_USER_PASSWORD_AUTH",
+                "ALLOW_REFRESH_TOKEN_AUTH",
+                "ALLOW_USER_SRP_AUTH",
+            ],
+        )
+        user_future = pool.submit(
+            cognito_client.admin_create_user,
+            UserPoolId=pool_id,
+            Username=DEFAULT_USER,
+            TemporaryPassword=DEFAULT_PASSWORD,
+            MessageAction="SUPPRESS",
+        )
+        app_client_response = app_client_future.result()
+        user_future.result()
     client_id = app_client_response["UserPoolClient"]["ClientId"]
     client_secret = app_client_response["UserPoolClient"]["ClientSecret"]
 
-    cognito_client.admin_create_user(
-        UserPoolId=pool_id,
-        Username=DEFAULT_USER,
-        TemporaryPassword="Temp123!",
-        MessageAction="SUPPRESS",
-    )
     cognito_client.admin_set_user_password(
         UserPoolId=pool_id,
         Username=DEFAULT_USER,
@@ -128,7 +249,7 @@ def get_or_create_cognito_pool(refresh_token: bool = False) -> Dict[str, str]:
             "SECRET_HASH": secret_hash,
         },
     )
-    bearer_token = auth_response["AuthenticationResult"]["AccessToken"]
+    bearer_token = _store_bearer_token(auth_response["AuthenticationResult"])
     discovery_url = (
         f"https://cognito-idp.{region}.amazonaws.com/{pool_id}/.well-known/openid-configuration"
     )
@@ -147,119 +268,151 @@ def get_or_create_cognito_pool(refresh_token: bool = False) -> Dict[str, str]:
     }
 
 
-def create_agentcore_runtime_execution_role(agent_name: str) -> str:
-    iam = boto3.client("iam")
-    region = boto3.session.Session().region_name
-    account_id = boto3.client("sts").get_caller_identity()["Account"]
+# IAM documents as JSON text templates: substituted once per deploy, no
+# dict building or json.dumps. $s3_statement is "" or a leading-comma statement.
+_TRUST_POLICY_TMPL = Template(
+    """{
+  "Version": "2012-10-17",
+  "Statement": [
+    {
+      "Sid": "AssumeRolePolicy",
+      "Effect": "Allow",
+      "Principal": {"Service": "bedrock-agentcore.amazonaws.com"},
+      "Action": "sts:AssumeRole",
+      "Condition": {
+        "StringEquals": {"aws:SourceAccount": "$account_id"},
+        "ArnLike": {"aws:SourceArn": "arn:aws:bedrock-agentcore:$region:$account_id:*"}
+      }
+    }
+  ]
+}"""
+)
+
+_POLICY_DOC_TMPL = Template(
+    """{
+  "Version": "2012-10-17",
+  "Statement": [
+    {
+      "Sid": "ECRImageAccess",
+      "Effect": "Allow",
+      "Action": ["ecr:BatchGetImage", "ecr:GetDownloadUrlForLayer"],
+      "Resource": ["arn:aws:ecr:$region:$account_id:repository/*"]
+    },
+    {
+      "Sid": "ECRTokenAccess",
+      "Effect": "Allow",
+      "Action": ["ecr:GetAuthorizationToken"],
+      "Resource": "*"
+    },
+    {
+      "Effect": "Allow",
+      "Action": ["logs:DescribeLogStreams", "logs:CreateLogGroup"],
+      "Resource": ["arn:aws:logs:$region:$account_id:log-group:/aws/bedrock-agentcore/runtimes/*"]
+    },
+    {
+      "Effect": "Allow",
+      "Action": ["logs:DescribeLogGroups"],
+      "Resource": ["arn:aws:logs:$region:$account_id:log-group:*"]
+    },
+    {
+      "Effect": "Allow",
+      "Action": ["logs:CreateLogStream", "logs:PutLogEvents"],
+      "Resource": [
+        "arn:aws:logs:$region:$account_id:log-group:/aws/bedrock-agentcore/runtimes/*:log-stream:*"
+      ]
+    },
+    {
+      "Effect": "Allow",
+      "Action": [
+        "xray:PutTraceSegments",
+        "xray:PutTelemetryRecords",
+        "xray:GetSamplingRules",
+        "xray:GetSamplingTargets"
+      ],
+      "Resource": ["*"]
+    },
+    {
+      "Effect": "Allow",
+      "Resource": "*",
+      "Action": "cloudwatch:PutMetricData",
+      "Condition": {"StringEquals": {"cloudwatch:namespace": "bedrock-agentcore"}}
+    },
+    {
+      "Sid": "BedrockModelInvocation",
+      "Effect": "Allow",
+      "Action": [
+        "bedrock:InvokeModel",
+        "bedrock:InvokeModelWithResponseStream",
+        "bedrock:ApplyGuardrail",
+        "bedrock:Retrieve"
+      ],
+      "Resource": [
+        "arn:aws:bedrock:*::foundation-model/*",
+        "arn:aws:bedrock:$region:$account_id:*"
+      ]
+    }$s3_statement
+  ]
+}"""
+)
+
+_S3_READ_STATEMENT_TMPL = Template(
+    """,
+    {
+      "Sid": "S3PriceRead",
+      "Effect": "Allow",
+      "Action": ["s3:GetObject"],
+      "Resource": ["arn:aws:s3:::$bucket/*"]
+    },
+    {
+      "Sid": "S3PriceList",
+      "Effect": "Allow",
+      "Action": ["s3:ListBucket"],
+      "Resource": ["arn:aws:s3:::$bucket"]
+    }"""
+)
+
+
+def _account_id() -> str:
+    name = _ssm_name("account_id")
+    account_id = get_ssm_parameter(name, with_decryption=False)
+    if not account_id:
+        account_id = _client("sts").get_caller_identity()["Account"]
+        put_ssm_parameter(name, account_id)
+    return account_id
 
+
+def create_agentcore_runtime_execution_role(agent_name: str) -> str:
+    iam = _client("iam")
+    region = _region()
     role_name = f"{agent_name}-AgentCoreRuntimeRole-{region}"
     policy_name = f"{agent_name}-AgentCoreRuntimePolicy-{region}"
+    arn_param = _ssm_name("runtime_execution_role_arn")
 
-    trust_policy = {
-        "Version": "2012-10-17",
-        "Statement": [
-            {
-                "Sid": "AssumeRolePolicy",
-                "Effect": "Allow",
-                "Principal": {"Service": "bedrock-agentcore.amazonaws.com"},
-                "Action": "sts:AssumeRole",
-                "Condition": {
-                    "StringEquals": {"aws:SourceAccount": account_id},
-                    "ArnLike": {
-                        "aws:SourceArn": f"arn:aws:bedrock-agentcore:{region}:{account_id}:*"
-                    },
-                },
-            }
-        ],
-    }
-
-    policy_document = {
-        "Version": "2012-10-17",
-        "Statement": [
-            {
-                "Sid": "ECRImageAccess",
-                "Effect": "Allow",
-                "Action": ["ecr:BatchGetImage", "ecr:GetDownloadUrlForLayer"],
-                "Resource": [f"arn:aws:ecr:{region}:{account_id}:repository/*"],
-            },
-            {
-                "Sid": "ECRTokenAccess",
-                "Effect": "Allow",
-                "Action": ["ecr:GetAuthorizationToken"],
-                "Resource": "*",
-            },
-            {
-                "Effect": "Allow",
-                "Action": ["logs:DescribeLogStreams", "logs:CreateLogGroup"],
-                "Resource": [
-                    f"arn:aws:logs:{region}:{account_id}:log-group:/aws/bedrock-agentcore/runtimes/*"
-                ],
-            },
-            {
-                "Effect": "Allow",
-                "Action": ["logs:DescribeLogGroups"],
-                "Resource": [f"arn:aws:logs:{region}:{account_id}:log-group:*"],
-            },
-            {
-                "Effect": "Allow",
-                "Action": ["logs:CreateLogStream", "logs:PutLogEvents"],
-                "Resource": [
-                    f"arn:aws:logs:{region}:{account_id}:log-group:/aws/bedrock-agentcore/runtimes/*:log-stream:*"
-                ],
-            },
-            {
-                "Effect": "Allow",
-                "Action": [
-                    "xray:PutTraceSegments",
-                    "xray:PutTelemetryRecords",
-                    "xray:GetSamplingRules",
-                    "xray:GetSamplingTargets",
-                ],
-                "Resource": ["*"],
-            },
-            {
-                "Effect": "Allow",
-                "Resource": "*",
-                "Action": "cloudwatch:PutMetricData",
-                "Condition": {"StringEquals": {"cloudwatch:namespace": "bedrock-agentcore"}},
-            },
-            {
-                "Sid": "BedrockModelInvocation",
-                "Effect": "Allow",
-                "Action": [
-                    "bedrock:InvokeModel",
-                    "bedrock:InvokeModelWithResponseStream",
-                    "bedrock:ApplyGuardrail",
-                    "bedrock:Retrieve",
-                ],
-                "Resource": [
-                    "arn:aws:bedrock:*::foundation-model/*",
-                    f"arn:aws:bedrock:{region}:{account_id}:*",
-                ],
-            },
-        ],
-    }
-
-    bucket = os.getenv("S3_PRICE_BUCKET")
-    if bucket:
-        policy_document["Statement"].append(
-            {
-                "Sid": "S3PriceRead",
-                "Effect": "Allow",
-                "Action": ["s3:GetObject"],
-                "Resource": [f"arn:aws:s3:::{bucket}/*"],
-            }
-        )
+    # Steady-state deploys: the role was created (or found) on an earlier run.
+    cached_arn = get_ssm_parameter(arn_param, with_decryption=False)
+    if cached_arn and cached_arn.endswith(f"/{role_name}"):
+        return cached_arn
 
     try:
         existing_role = iam.get_role(RoleName=role_name)
-        return existing_role["Role"]["Arn"]
     except iam.exceptions.NoSuchEntityException:
         pass
+    else:
+        put_ssm_parameter(arn_param, existing_role["Role"]["Arn"])
+        return existing_role["Role"]["Arn"]
+
+    account_id = _account_id()
+    trust_policy = _TRUST_POLICY_TMPL.substitute(region=region, account_id=account_id)
+    bucket = os.getenv("S3_PRICE_BUCKET")
+    policy_document = _POLICY_DOC_TMPL.substitute(
+        region=region,
+        account_id=account_id,
+        s3_statement=_S3_READ_STATEMENT_TMPL.substitute(bucket=bucket) if bucket else "",
+    )
 
     role_response = iam.create_role(
         RoleName=role_name,
-        AssumeRolePolicyDocument=json.dumps(trust_policy),
+        AssumeRolePolicyDocument=trust_policy,
         Description="IAM role for Poke Platform AgentCore Runtime",
     )
 
@@ -269,7 +422,7 @@ def create_agentcore_runtime_execution_role(agent_name: str) -> str:
     except iam.exceptions.NoSuchEntityException:
         policy_response = iam.create_policy(
             PolicyName=policy_name,
-            PolicyDocument=json.dumps(policy_document),
+            PolicyDocument=policy_document,
             Description="Policy for Poke Platform AgentCore Runtime",
         )
         policy_arn = policy_response["Policy"]["Arn"]
@@ -280,24 +433,92 @@ def create_agentcore_runtime_execution_role(agent_name: str) -> str:
         if "already" not in str(exc).lower():
             raise
 
-    put_ssm_parameter(_ssm_name("runtime_execution_role_arn"), role_response["Role"]["Arn"])
+    put_ssm_parameter(arn_param, role_response["Role"]["Arn"])
     return role_response["Role"]["Arn"]
 
 
+_COPY_IGNORE = shutil.ignore_patterns("__pycache__", "*.pyc")
+
+
+def _mirror_tree(src: Path, dest: Path) -> None:
+    # rmtree first so files deleted from src don't linger in the build; with
+    # hardlinks that is just unlinks. Hardlinking fails across filesystems
+    # (EXDEV) or on some mounts, in which case fall back to a real copy.
+    if dest.exists():
+        shutil.rmtree(dest)
+    try:
+        shutil.copytree(src, dest, copy_function=os.link, ignore=_COPY_IGNORE)
+    except OSError:
+        shutil.rmtree(dest, ignore_errors=True)
+        shutil.copytree(src, dest, ignore=_COPY_IGNORE)
+
+
 def prepare_workspace(repo_root: Path, workspace: Path) -> None:
     src_dir = repo_root / "services" / "agent_runtime"
     if not src_dir.exists():
         raise FileNotFoundError(f"Agent runtime folder not found: {src_dir}")
 
     workspace.mkdir(parents=True, exist_ok=True)
-    for name in ["agents", "observability"]:
-        src = src_dir / name
-        dest = workspace / name
-        if dest.exists():
-            shutil.rmtree(dest)
-        shutil.copytree(src, dest)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        list(
+            pool.map(
+                lambda name: _mirror_tree(src_dir / name, workspace / name),
+                ["agents", "observability"],
+            )
+        )
 
     shutil.copy2(src_dir / "requirements.txt", workspace / "requirements.txt")
+    _ensure_dockerignore(workspace / ".dockerignore")
+
+
+# Keeps the uploaded build context small and the layer cache stable. Appended
+# to (not replacing) the .dockerignore the starter toolkit generates.
+_DOCKERIGNORE_PATTERNS = (
+    "__pycache__",
+    "*.pyc",
+    ".pytest_cache",
+    "tests",
+    "*.ipynb",
+    ".venv",
+)
+
+
+def _ensure_dockerignore(path: Path) -> None:
+    existing = path.read_text() if path.exists() else ""
+    present = set(existing.splitlines())
+    missing = [p for p in _DOCKERIGNORE_PATTERNS if p not in present]
+    if missing:
+        prefix = existing if not existing or existing.endswith("\n") else existing + "\n"
+        path.write_text(prefix + "\n".join(missing) + "\n")
+
+
+# Parts of an agent's .bedrock_agentcore.yaml section that launch/invoke fill
+# in themselves; they must not make the next launch look like a config change.
+_LAUNCH_STATE_KEYS = frozenset(("bedrock_agentcore", "codebuild", "memory"))
+
+
+def _build_fingerprint(workspace: Path, agent_cfg: Dict, env_vars: Dict[str, str]) -> str:
+    """SHA256 over everything a launch builds from.
+
+    Covers requirements.txt, the Dockerfile, the source trees, the agent's
+    config section (role, authorizer, entrypoint, ...) and the runtime env.
+    Computed at launch time: the sources are hardlinked, so in-place edits
+    after ``configure`` still change it.
+    """
+    digest = hashlib.sha256()
+    files = [workspace / "requirements.txt", workspace / "Dockerfile"]
+    for name in ("agents", "observability"):
+        files.extend(sorted(p for p in (workspace / name).rglob("*") if p.is_file()))
+    for path in files:
+        if not path.is_file():
+            continue
+        digest.update(path.relative_to(workspace).as_posix().encode())
+        digest.update(b"\0")
+        digest.update(path.read_bytes())
+    config = {k: v for k, v in agent_cfg.items() if k not in _LAUNCH_STATE_KEYS}
+    digest.update(_dumps(config, sort_keys=True).encode())
+    digest.update(_dumps(env_vars, sort_keys=True).encode())
+    return digest.hexdigest()
 
 
 def configure_runtime(args: argparse.Namespace) -> None:
@@ -321,8 +542,10 @@ def configure_runtime(args: argparse.Namespace) -> None:
         request_header_configuration = {
             "requestHeaderAllowlist": ["Authorization"],
         }
-        if cognito.get("bearer_token"):
-            put_ssm_parameter(_ssm_name("bearer_token"), cognito["bearer_token"], secure=True)
+        # The bearer token (and its expiry) is persisted to SSM only when
+        # Cognito actually issued a new one; see _store_bearer_token.
+
+    from bedrock_agentcore_starter_toolkit import Runtime
 
     runtime = Runtime()
     response = runtime.configure(
@@ -339,7 +562,35 @@ def configure_runtime(args: argparse.Namespace) -> None:
     print("Configuration completed:", response)
 
 
+# Parsed .bedrock_agentcore.yaml keyed by path, valid while its mtime matches.
+_AGENTCORE_CONFIG: Dict[Path, tuple] = {}
+
+
+def _load_agentcore_config(path: Path) -> Dict:
+    mtime = path.stat().st_mtime_ns
+    cached = _AGENTCORE_CONFIG.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    import yaml
+
+    # libyaml's C loader when PyYAML was built with it; the pure-Python one is slow.
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    data = yaml.load(path.read_text(), Loader=loader) or {}
+    _AGENTCORE_CONFIG[path] = (mtime, data)
+    return data
+
+
+def _write_agentcore_config(path: Path, data: Dict) -> None:
+    import yaml
+
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    path.write_text(yaml.dump(data, Dumper=dumper, sort_keys=False))
+    _AGENTCORE_CONFIG[path] = (path.stat().st_mtime_ns, data)
+
+
 def launch_runtime(args: argparse.Namespace) -> None:
+    from bedrock_agentcore_starter_toolkit import Runtime
+
     runtime = Runtime()
     env_vars = {}
     for item in args.env:
@@ -348,6 +599,10 @@ def launch_runtime(args: argparse.Namespace) -> None:
         key, value = item.split("=", 1)
         env_vars[key] = value
 
+    # Pin the runtime to the deploy region (same POKE_REGION the CDK app reads).
+    if args.region and "POKE_REGION" not in env_vars:
+        env_vars["POKE_REGION"] = args.region
+
     # Propagate model config from local env if provided.
     bedrock_model_id = os.getenv("BEDROCK_MODEL_ID")
     if bedrock_model_id and "BEDROCK_MODEL_ID" not in env_vars:
@@ -395,41 +650,65 @@ def launch_runtime(args: argparse.Namespace) -> None:
         # Disable ADOT so Langfuse is the active OTEL exporter.
         env_vars.setdefault("DISABLE_ADOT_OBSERVABILITY", "true")
 
-    config_path = Path(args.workspace).expanduser().resolve() / ".bedrock_agentcore.yaml"
+    workspace = Path(args.workspace).expanduser().resolve()
+    config_path = workspace / ".bedrock_agentcore.yaml"
     if config_path.exists():
-        config_data = yaml.safe_load(config_path.read_text())
+        config_data = _load_agentcore_config(config_path)
         agents = config_data.get("agents", {})
         agent_cfg = agents.get(args.agent_name)
         if agent_cfg is not None and not agent_cfg.get("source_path"):
-            agent_cfg["source_path"] = str(Path(args.workspace).expanduser().resolve())
-            config_path.write_text(yaml.safe_dump(config_data, sort_keys=False))
+            agent_cfg["source_path"] = str(workspace)
+            _write_agentcore_config(config_path, config_data)
         runtime._config_path = config_path
     else:
         raise FileNotFoundError(
             f"Missing config at {config_path}. Run `configure` first."
         )
 
-    launch_result = runtime.launch(auto_update_on_conflict=args.auto_update, env_vars=env_vars)
-    print("Launch completed:", launch_result.agent_arn)
-    put_ssm_parameter(_ssm_name("runtime_arn"), launch_result.agent_arn)
+    # Same sources, config and env as the last successful launch: nothing to rebuild.
+    fingerprint = _build_fingerprint(workspace, agent_cfg or {}, env_vars)
+    fingerprint_param = _ssm_name("last_build_fingerprint")
+    if (
+        not args.force
+        and get_ssm_parameter(fingerprint_param, with_decryption=False) == fingerprint
+    ):
+        print("Sources, config and env unchanged since the last launch; skipping (use --force to rebuild).")
+    else:
+        launch_result = runtime.launch(
+            auto_update_on_conflict=args.auto_update, env_vars=env_vars
+        )
+        print("Launch completed:", launch_result.agent_arn)
+        put_ssm_parameter(_ssm_name("runtime_arn"), launch_result.agent_arn)
+        put_ssm_parameter(fingerprint_param, fingerprint)
 
     if args.wait:
-        wait_for_ready(runtime)
+        wait_for_ready(runtime, timeout=args.timeout)
 
 
-def wait_for_ready(runtime: Runtime) -> None:
+def wait_for_ready(runtime: Runtime, timeout: float = 1800.0) -> None:
     end_status = {"READY", "CREATE_FAILED", "DELETE_FAILED", "UPDATE_FAILED"}
+    deadline = time.monotonic() + timeout
+    # Start polling fast (short launches finish early), back off to 30s with
+    # +/-20% jitter so concurrent deploys don't poll in lockstep.
+    delay = 2.0
     status_response = runtime.status()
     status = status_response.endpoint["status"]
     while status not in end_status:
+        if time.monotonic() >= deadline:
+            raise TimeoutError(
+                f"Runtime not ready after {timeout:.0f}s (last status: {status})"
+            )
         print(f"Waiting for deployment... Current status: {status}")
-        time.sleep(10)
+        time.sleep(delay * (0.8 + 0.4 * random.random()))
+        delay = min(delay * 1.5, 30.0)
         status_response = runtime.status()
         status = status_response.endpoint["status"]
     print(f"Final status: {status}")
 
 
 def invoke_runtime(args: argparse.Namespace) -> None:
+    from bedrock_agentcore_starter_toolkit import Runtime
+
     runtime = Runtime()
     bearer_token = args.bearer_token or get_ssm_parameter(_ssm_name("bearer_token"))
     if not bearer_token:
@@ -437,21 +716,23 @@ def invoke_runtime(args: argparse.Namespace) -> None:
 
     payload = {"prompt": args.prompt}
     response = runtime.invoke(payload, bearer_token=bearer_token, session_id=args.session_id)
-    print(json.dumps(response, indent=2))
+    print(_dumps(response, pretty=True))
 
 
 def status_runtime(args: argparse.Namespace) -> None:
+    from bedrock_agentcore_starter_toolkit import Runtime
+
     runtime = Runtime()
     config_path = Path(args.workspace).expanduser().resolve() / ".bedrock_agentcore.yaml"
     if config_path.exists():
         runtime._config_path = config_path
     status_response = runtime.status()
-    print(json.dumps(status_response, indent=2, default=str))
+    print(_dumps(status_response, pretty=True))
 
 
 def parse_args(argv: Optional[list] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Deploy AgentCore Runtime for Poke Platform")
-    parser.add_argument("--region", default=boto3.session.Session().region_name)
+    parser.add_argument("--region", default=None, help="Defaults to the AWS session region")
     parser.add_argument("--agent-name", default="pokemon_trader_agent")
     parser.add_argument("--workspace", default=".agentcore_runtime_build")
 
@@ -466,6 +747,12 @@ def parse_args(argv: Optional[list] = None) -> argparse.Namespace:
     launch.add_argument("--env", action="append", default=[], help="Runtime env var KEY=VALUE")
     launch.add_argument("--auto-update", action="store_true", help="Auto-update on conflict")
     launch.add_argument("--wait", action="store_true", help="Wait for READY status")
+    launch.add_argument(
+        "--force", action="store_true", help="Launch even if the build fingerprint is unchanged"
+    )
+    launch.add_argument(
+        "--timeout", type=float, default=1800, help="Max seconds to wait with --wait"
+    )
     launch.set_defaults(func=launch_runtime)
 
     status = subparsers.add_parser("status", help="Get AgentCore Runtime status")
@@ -482,6 +769,7 @@ def parse_args(argv: Optional[list] = None) -> argparse.Namespace:
 
 def main() -> None:
     args = parse_args()
+    args.region = args.region or _region()
     if not args.region:
         print("AWS region not configured. Set AWS_REGION or AWS_DEFAULT_REGION.")
         sys.exit(1)
@@ -1,26 +1,48 @@
 #!/usr/bin/env python3
 
 import argparse
+import itertools
 import os
+import uuid
+from typing import Iterator
 
 import psycopg2
 
+DB_HOST = os.environ.get("DB_HOST")
+DB_PORT = int(os.environ.get("DB_PORT", "5432"))
+DB_NAME = os.environ.get("DB_NAME", "poke")
+DB_USER = os.environ.get("DB_USER")
+DB_PASSWORD = os.environ.get("DB_PASSWORD")
+DB_IAM_AUTH = os.environ.get("DB_IAM_AUTH") == "1"
+
+
+def db_password():
+    # Via the RDS Proxy (DB_IAM_AUTH=1) the password is a 15-minute IAM token.
+    if not DB_IAM_AUTH:
+        return DB_PASSWORD
+    import boto3
+
+    return boto3.client("rds").generate_db_auth_token(DB_HOST, DB_PORT, DB_USER)
+
 
 def connect():
     return psycopg2.connect(
-        host=os.environ["DB_HOST"],
-        port=int(os.environ.get("DB_PORT", "5432")),
-        dbname=os.environ.get("DB_NAME", "poke"),
-        user=os.environ["DB_USER"],
-        password=os.environ["DB_PASSWORD"],
+        host=DB_HOST,
+        port=DB_PORT,
+        dbname=DB_NAME,
+        user=DB_USER,
+        password=db_password(),
         connect_timeout=10,
     )
 
 
-def fetch_price_history(conn, asset_id: str) -> list[tuple]:
-    with conn.cursor() as cur:
+def fetch_price_history(conn, asset_id: str, itersize: int = 2000) -> Iterator[tuple]:
+    """Stream rows through a server-side cursor, `itersize` rows per round-trip."""
+    with conn.cursor(name=f"ph_{uuid.uuid4().hex}") as cur:
+        cur.itersize = itersize
         cur.execute(
             """
+            WITH arg(id) AS (VALUES (%s::text))
             SELECT snapshot_date,
                    'tcgplayer' AS source,
                    variant,
@@ -38,7 +60,7 @@ def fetch_price_history(conn, asset_id: str) -> list[tuple]:
                    url,
                    source_updated_at
             FROM tcgplayer_price_snapshot
-            WHERE asset_id = %s
+            WHERE asset_id = (SELECT id FROM arg)
             UNION ALL
             SELECT snapshot_date,
                    'cardmarket' AS source,
@@ -57,12 +79,12 @@ def fetch_price_history(conn, asset_id: str) -> list[tuple]:
                    url,
                    source_updated_at
             FROM cardmarket_price_snapshot
-            WHERE asset_id = %s
+            WHERE asset_id = (SELECT id FROM arg)
             ORDER BY snapshot_date DESC, source, variant;
             """,
-            (asset_id, asset_id),
+            (asset_id,),
         )
-        return cur.fetchall()
+        yield from cur
 
 
 def main() -> None:
@@ -75,12 +97,6 @@ def main() -> None:
     )
     args = parser.parse_args()
 
-    conn = connect()
-    try:
-        rows = fetch_price_history(conn, args.card_id)
-    finally:
-        conn.close()
-
     columns = [
         "snapshot_date",
         "source",
@@ -99,26 +115,35 @@ def main() -> None:
         "url",
         "source_updated_at",
     ]
-    if not rows:
-        print(f"No price history found for {args.card_id}.")
-        return
 
+    conn = connect()
+    rows = fetch_price_history(conn, args.card_id)
+    try:
+        first = next(rows, None)
+        if first is None:
+            print(f"No price history found for {args.card_id}.")
+            return
+        _print_rows(columns, itertools.chain([first], rows))
+    finally:
+        rows.close()  # close the server-side cursor before the connection
+        conn.close()
+
+
+def _print_rows(columns: list[str], rows: Iterator[tuple]) -> None:
     try:
         import pandas as pd
     except ImportError:
         pd = None
 
     if pd is not None:
-        df = pd.DataFrame(rows, columns=columns)
+        df = pd.DataFrame.from_records(rows, columns=columns)
         print(df.to_string(index=False))
         return
 
-    widths = [len(c) for c in columns]
-    formatted_rows = []
-    for row in rows:
-        formatted = ["" if v is None else str(v) for v in row]
-        formatted_rows.append(formatted)
-        widths = [max(w, len(v)) for w, v in zip(widths, formatted)]
+    formatted_rows = [["" if v is None else str(v) for v in row] for row in rows]
+    # Column-wise view so each width is a single max() over the column.
+    cols = list(zip(*formatted_rows))
+    widths = [max(len(c), max(map(len, col), default=0)) for c, col in zip(columns, cols)]
 
     header = " | ".join(c.ljust(w) for c, w in zip(columns, widths))
     sep = "-+-".join("-" * w for w in widths)
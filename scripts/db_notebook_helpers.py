@@ -1,13 +1,32 @@
+from __future__ import annotations
+
+import functools
 import io
 import json
 import os
+import queue
+import shlex
+import shutil
 import subprocess
-from typing import Dict
+import threading
+import time
+import uuid
+from typing import TYPE_CHECKING, Dict, Iterator, Optional, Union
 
-import boto3
-import pandas as pd
 import psycopg2
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+# boto3 and pandas are imported where they're used so importing this module
+# (e.g. just for connect()) stays cheap.
+if TYPE_CHECKING:
+    import pandas as pd
+
 DEFAULT_REGION = os.environ.get("REGION", "us-east-2")
 DEFAULT_SECRET_ARN = os.environ.get(
     "SECRET_ARN",
@@ -16,13 +35,21 @@ DEFAULT_SECRET_ARN = os.environ.get(
 DEFAULT_STACK = os.environ.get("STACK", "PokePlatformStack")
 DEFAULT_CONTAINER = os.environ.get("CONTAINER", "ApiContainer")
 
+# Reused across notebook cells so the catalog's prepared statements survive.
+_CATALOG_CONN: Optional["psycopg2.extensions.connection"] = None
+# One ECS Exec psql session per (region, stack, container), kept for the notebook's lifetime.
+_ECS_SESSIONS: Dict[tuple, "EcsExecSession"] = {}
+
 
+@functools.lru_cache(maxsize=4)
 def fetch_db_secret(region: str = DEFAULT_REGION, secret_arn: str = DEFAULT_SECRET_ARN) -> Dict[str, str]:
-    """Load DB connection details from Secrets Manager."""
+    """Load DB connection details from Secrets Manager (cached per region/ARN)."""
+    import boto3
+
     client = boto3.client("secretsmanager", region_name=region)
     resp = client.get_secret_value(SecretId=secret_arn)
     secret_str = resp.get("SecretString") or "{}"
-    return json.loads(secret_str)
+    return _loads(secret_str)
 
 
 def connect(region: str = DEFAULT_REGION, secret_arn: str = DEFAULT_SECRET_ARN):
@@ -37,13 +64,201 @@ def connect(region: str = DEFAULT_REGION, secret_arn: str = DEFAULT_SECRET_ARN):
         connect_timeout=10,
     )
 
+
+class EcsExecSession:
+    """A long-lived psql process inside the API task, reached through ECS Exec.
+
+    Opening an ECS Exec session (CloudFormation lookup, ``execute_command``,
+    session-manager-plugin startup) costs seconds, so the session is opened
+    once and each query is written to psql's stdin as a ``\\copy ... csv``
+    command. Output is framed with ``\\echo`` markers.
+
+    The session has a TTY, so psql runs interactively; its prompts are blanked
+    and stdout is drained by a reader thread so a stuck session raises
+    ``RuntimeError`` after ``timeout`` seconds instead of hanging.
+    """
+
+    _PSQL = (
+        'stty -echo 2>/dev/null; '
+        # The RDS Proxy takes IAM tokens only; sign one with the task role.
+        'if [ "${DB_IAM_AUTH:-}" = 1 ]; then DB_PASSWORD="$(python3 -c '
+        '"import sys, boto3; h, p, u = sys.argv[1:]; '
+        'print(boto3.client(\\"rds\\").generate_db_auth_token(h, int(p), u))" '
+        '"$DB_HOST" "${DB_PORT:-5432}" "$DB_USER")"; fi; '
+        'PGPASSWORD="$DB_PASSWORD" exec psql -h "$DB_HOST" -p "${DB_PORT:-5432}" '
+        '-U "$DB_USER" -d "${DB_NAME:-poke}" -X -q -v ON_ERROR_STOP=0 -P pager=off '
+        '-v PROMPT1= -v PROMPT2= -v PROMPT3='
+    )
+
+    def __init__(self, region: str, stack: str, container: str, timeout: float = 300.0) -> None:
+        self.region = region
+        self.stack = stack
+        self.container = container
+        self.timeout = timeout
+        self._proc: Optional[subprocess.Popen] = None
+        self._lines: Optional[queue.Queue] = None
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def _resolve_task(self, session) -> tuple:
+        cfn = session.client("cloudformation")
+        cluster = service = None
+        for page in cfn.get_paginator("list_stack_resources").paginate(StackName=self.stack):
+            for res in page["StackResourceSummaries"]:
+                if res["ResourceType"] == "AWS::ECS::Cluster" and cluster is None:
+                    cluster = res["PhysicalResourceId"]
+                elif res["ResourceType"] == "AWS::ECS::Service" and service is None:
+                    service = res["PhysicalResourceId"]
+        if not cluster or not service:
+            raise RuntimeError(f"ECS cluster/service not found in stack {self.stack}.")
+        ecs = session.client("ecs")
+        tasks = ecs.list_tasks(
+            cluster=cluster, serviceName=service, desiredStatus="RUNNING", maxResults=1
+        )["taskArns"]
+        if not tasks:
+            raise RuntimeError(f"No RUNNING task found for service {service}.")
+        return ecs, cluster, tasks[0]
+
+    def open(self) -> None:
+        plugin = shutil.which("session-manager-plugin")
+        if plugin is None:
+            raise RuntimeError("session-manager-plugin is not installed.")
+        import boto3
+
+        session = boto3.session.Session(region_name=self.region)
+        ecs, cluster, task = self._resolve_task(session)
+        resp = ecs.execute_command(
+            cluster=cluster,
+            task=task,
+            container=self.container,
+            interactive=True,
+            command=f"bash -lc {shlex.quote(self._PSQL)}",
+        )
+        target = f"ecs:{cluster.split('/')[-1]}_{task.split('/')[-1]}_{resp['containerRuntimeId']}"
+        self._proc = subprocess.Popen(
+            [
+                plugin,
+                json.dumps(resp["session"]),
+                self.region,
+                "StartSession",
+                "",
+                json.dumps({"Target": target}),
+                f"https://ecs.{self.region}.amazonaws.com",
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+        )
+        self._lines = queue.Queue()
+        threading.Thread(
+            target=self._pump, args=(self._proc.stdout, self._lines), daemon=True
+        ).start()
+
+    @staticmethod
+    def _pump(stream, lines: queue.Queue) -> None:
+        for line in stream:
+            lines.put(line)
+        lines.put(None)
+
+    def close(self) -> None:
+        if self.alive:
+            try:
+                self._proc.stdin.write("\\q\n")
+                self._proc.stdin.flush()
+                self._proc.wait(timeout=5)
+            except (OSError, subprocess.TimeoutExpired):
+                self._proc.kill()
+        self._proc = None
+        self._lines = None
+
+    def _read_until(self, marker: str, deadline: float) -> tuple:
+        """Collect lines up to ``marker``; returns (lines, text before the marker)."""
+        lines = []
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RuntimeError("ECS exec query timed out.")
+            try:
+                line = self._lines.get(timeout=remaining)
+            except queue.Empty:
+                raise RuntimeError("ECS exec query timed out.") from None
+            if line is None:
+                raise RuntimeError("ECS exec session closed mid-query.")
+            line = line.rstrip("\r\n")
+            # Skip our own "\echo <marker>" input if the TTY echoes it back.
+            if line.endswith(marker) and not line.endswith("\\echo " + marker):
+                return lines, line[: -len(marker)]
+            lines.append(line)
+
+    def query_csv(self, query: str) -> str:
+        if not self.alive:
+            self.open()
+        tag = uuid.uuid4().hex
+        begin, end = f"__begin_{tag}__", f"__end_{tag}__"
+        sql = " ".join(query.splitlines()).strip().rstrip(";")
+        self._proc.stdin.write(
+            f"\\echo {begin}\n\\copy ({sql}) TO STDOUT WITH CSV HEADER\n\\echo {end}\n"
+        )
+        self._proc.stdin.flush()
+        deadline = time.monotonic() + self.timeout
+        _, prefix = self._read_until(begin, deadline)
+        lines, _ = self._read_until(end, deadline)
+        # Any prompt/echo residue in front of the marker also precedes the header.
+        if prefix and lines and lines[0].startswith(prefix):
+            lines[0] = lines[0][len(prefix):]
+        errors = [line for line in lines if line.startswith(("ERROR:", "psql:"))]
+        if errors:
+            raise RuntimeError("ECS exec query failed:\n" + "\n".join(errors))
+        return "\n".join(line for line in lines if line.strip())
+
+
+def _ecs_session(region: str, stack: str, container: str) -> EcsExecSession:
+    key = (region, stack, container)
+    session = _ECS_SESSIONS.get(key)
+    if session is None:
+        session = _ECS_SESSIONS[key] = EcsExecSession(region, stack, container)
+    return session
+
+
 def read_sql_via_ecs_exec(
     query: str,
     region: str = DEFAULT_REGION,
     stack: str = DEFAULT_STACK,
     container: str = DEFAULT_CONTAINER,
 ) -> pd.DataFrame:
-    """Run a SQL query via ECS Exec and return a DataFrame (CSV output)."""
+    """Run a SQL query via a persistent ECS Exec psql session and return a DataFrame.
+
+    Falls back to a one-shot ``run_db_query.sh`` call if the session can't be
+    opened or drops mid-query.
+    """
+    import pandas as pd
+    from botocore.exceptions import BotoCoreError, ClientError
+
+    session = _ecs_session(region, stack, container)
+    try:
+        output = session.query_csv(query)
+    except (RuntimeError, OSError, BotoCoreError, ClientError):
+        session.close()
+    else:
+        if output:
+            return pd.read_csv(io.StringIO(output))
+        raise RuntimeError("ECS exec query returned no output.")
+    return _read_sql_via_ecs_exec_script(query, region=region, stack=stack, container=container)
+
+
+def _read_sql_via_ecs_exec_script(
+    query: str,
+    region: str = DEFAULT_REGION,
+    stack: str = DEFAULT_STACK,
+    container: str = DEFAULT_CONTAINER,
+) -> pd.DataFrame:
+    """Run a SQL query through run_db_query.sh (one ECS Exec session per call)."""
+    import pandas as pd
+
     script_path = os.path.join(os.path.dirname(__file__), "run_db_query.sh")
     cmd = [
         "bash",
@@ -90,14 +305,132 @@ def read_sql(
     stack: str = DEFAULT_STACK,
     container: str = DEFAULT_CONTAINER,
     use_ecs_exec: bool = False,
-) -> pd.DataFrame:
-    """Run a SQL query and return a DataFrame."""
+    use_copy: bool = True,
+    *,
+    dtype_backend: str = "pyarrow",
+    chunksize: int = 50_000,
+    iterator: bool = False,
+) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+    """Run a SQL query and return a DataFrame (read-only queries go through COPY).
+
+    Columns use ``dtype_backend`` types, with date/timestamp columns parsed;
+    pass ``iterator=True`` to get ``chunksize`` row frames instead of one frame.
+    """
+    import pandas as pd
+
     if use_ecs_exec or os.environ.get("USE_ECS_EXEC") == "1":
         return read_sql_via_ecs_exec(query, region=region, stack=stack, container=container)
     try:
         with connect(region=region, secret_arn=secret_arn) as conn:
-            return pd.read_sql(query, conn)
+            if use_copy and _copyable(query):
+                return _read_sql_copy(
+                    query,
+                    conn,
+                    dtype_backend=dtype_backend,
+                    chunksize=chunksize if iterator else None,
+                )
+            chunks = pd.read_sql_query(
+                query, conn, chunksize=chunksize, dtype_backend=dtype_backend
+            )
+            if iterator:
+                return chunks
+            return _concat_chunks(chunks)
     except psycopg2.OperationalError as exc:
         if "timeout expired" in str(exc) or "could not connect" in str(exc):
             return read_sql_via_ecs_exec(query, region=region, stack=stack, container=container)
         raise
+
+
+def _copyable(query: str) -> bool:
+    head = query.lstrip().split(None, 1)[0].upper() if query.strip() else ""
+    return head in ("SELECT", "WITH", "VALUES", "TABLE")
+
+
+def _concat_chunks(chunks: Iterator[pd.DataFrame]) -> pd.DataFrame:
+    import pandas as pd
+
+    frames = list(chunks)
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+
+# pg_type OIDs that COPY renders as text: date, timestamp / timestamptz.
+_NAIVE_DATETIME_OIDS = frozenset((1082, 1114))
+_TZ_DATETIME_OIDS = frozenset((1184,))
+
+
+def _read_sql_copy(
+    query: str,
+    conn,
+    dtype_backend: str = "pyarrow",
+    chunksize: Optional[int] = None,
+) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+    """Pull the result as CSV via COPY and parse it with pandas' C reader.
+
+    Skips psycopg2's per-row/per-cell Python object construction. A ``LIMIT 0``
+    probe supplies the column types so date/timestamp columns are parsed
+    instead of left as strings. With ``chunksize`` an iterator of frames is
+    returned.
+    """
+    import pandas as pd
+
+    body = query.strip().rstrip(";")
+    buf = io.StringIO()
+    with conn.cursor() as cur:
+        cur.execute(f"SELECT * FROM ({body}) AS _q LIMIT 0")
+        naive = [c.name for c in cur.description if c.type_code in _NAIVE_DATETIME_OIDS]
+        aware = [c.name for c in cur.description if c.type_code in _TZ_DATETIME_OIDS]
+        cur.copy_expert(f"COPY ({body}) TO STDOUT WITH (FORMAT csv, HEADER true)", buf)
+    buf.seek(0)
+
+    def typed(df: pd.DataFrame) -> pd.DataFrame:
+        for col in naive:
+            df[col] = pd.to_datetime(df[col])
+        for col in aware:
+            df[col] = pd.to_datetime(df[col], utc=True)
+        return df
+
+    if chunksize is None:
+        return typed(pd.read_csv(buf, dtype_backend=dtype_backend))
+    return (typed(df) for df in pd.read_csv(buf, dtype_backend=dtype_backend, chunksize=chunksize))
+
+
+def _catalog_connection(region: str, secret_arn: str):
+    global _CATALOG_CONN
+    if _CATALOG_CONN is None or _CATALOG_CONN.closed:
+        from notebooks.db_queries_catalog import prepare_all
+
+        conn = connect(region=region, secret_arn=secret_arn)
+        conn.autocommit = True
+        prepare_all(conn)
+        _CATALOG_CONN = conn
+    return _CATALOG_CONN
+
+
+def read_query(
+    name: str,
+    region: str = DEFAULT_REGION,
+    secret_arn: str = DEFAULT_SECRET_ARN,
+    stack: str = DEFAULT_STACK,
+    container: str = DEFAULT_CONTAINER,
+    use_ecs_exec: bool = False,
+) -> pd.DataFrame:
+    """Run a catalog query (by name) via its server-side prepared statement."""
+    import pandas as pd
+    from notebooks.db_queries_catalog import QUERY_BY_NAME
+
+    query = QUERY_BY_NAME[name]
+    if use_ecs_exec or os.environ.get("USE_ECS_EXEC") == "1":
+        return read_sql_via_ecs_exec(query.sql, region=region, stack=stack, container=container)
+    try:
+        conn = _catalog_connection(region, secret_arn)
+        return _concat_chunks(
+            pd.read_sql_query(
+                f"EXECUTE {query.prepared_name}", conn, chunksize=50_000, dtype_backend="pyarrow"
+            )
+        )
+    except psycopg2.OperationalError as exc:
+        if "timeout expired" in str(exc) or "could not connect" in str(exc):
+            return read_sql_via_ecs_exec(query.sql, region=region, stack=stack, container=container)
+        raise
@@ -79,6 +79,9 @@ fi\n\
 : \"${DB_PORT:=5432}\"\n\
 : \"${DB_NAME:=poke}\"\n\
 : \"${DB_USER:?DB_USER missing}\"\n\
+if [ \"${DB_IAM_AUTH:-}\" = 1 ]; then\n\
+  DB_PASSWORD=\"$(python3 -c \"import sys, boto3; h, p, u = sys.argv[1:]; print(boto3.client(\\\"rds\\\").generate_db_auth_token(h, int(p), u))\" \"$DB_HOST\" \"$DB_PORT\" \"$DB_USER\")\"\n\
+fi\n\
 : \"${DB_PASSWORD:?DB_PASSWORD missing}\"\n\
 \n\
 psql_cmd() { PGPASSWORD=\"$DB_PASSWORD\" psql -h \"$DB_HOST\" -p \"$DB_PORT\" -U \"$DB_USER\" -d \"$DB_NAME\" -t -A -c \"$1\"; }\n\
@@ -4,13 +4,21 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import random
 import sys
-from typing import Any, Dict
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator
 
 from langfuse import Langfuse
-from langfuse.api.resources.dataset_items.types.create_dataset_item_request import (
-    CreateDatasetItemRequest,
-)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+_loads = orjson.loads if orjson is not None else json.loads
 
 
 def _load_env_from_config(path: str) -> None:
@@ -26,21 +34,65 @@ def _load_env_from_config(path: str) -> None:
                 os.environ[key] = value
 
 
-def _load_jsonl(path: str) -> list[Dict[str, Any]]:
-    items: list[Dict[str, Any]] = []
-    with open(path, "r", encoding="utf-8") as fh:
+def _iter_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield one object per non-blank line so uploads start before the file is read."""
+    with open(path, "rb") as fh:
         for idx, line in enumerate(fh, 1):
             line = line.strip()
             if not line:
                 continue
             try:
-                obj = json.loads(line)
-            except Exception as exc:
+                obj = _loads(line)
+            except ValueError as exc:  # orjson.JSONDecodeError / json.JSONDecodeError
                 raise ValueError(f"Invalid JSON on line {idx}: {exc}") from exc
             if not isinstance(obj, dict):
                 raise ValueError(f"Line {idx} must be a JSON object.")
-            items.append(obj)
-    return items
+            yield obj
+
+
+class _RateLimiter:
+    """Spaces acquisitions to at most `rps` per second across threads."""
+
+    def __init__(self, rps: float) -> None:
+        self._interval = 1.0 / rps if rps > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self._interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _create_item(
+    langfuse: Langfuse,
+    limiter: _RateLimiter,
+    dataset: str,
+    item: Dict[str, Any],
+    max_attempts: int = 6,
+) -> str:
+    for attempt in range(max_attempts):
+        limiter.acquire()
+        try:
+            langfuse.create_dataset_item(
+                dataset_name=dataset,
+                input=item.get("input"),
+                expected_output=item.get("expected_output"),
+                metadata=item.get("metadata"),
+                id=item.get("id"),
+            )
+            return item.get("id") or "auto-id"
+        except Exception as exc:
+            if getattr(exc, "status_code", None) != 429 or attempt == max_attempts - 1:
+                raise
+            # Exponential backoff with jitter on rate limiting.
+            time.sleep(min(30.0, 2.0**attempt) * random.uniform(0.5, 1.0))
+    raise AssertionError("unreachable")
 
 
 def main() -> int:
@@ -48,6 +100,8 @@ def main() -> int:
     parser.add_argument("--dataset", required=True, help="Langfuse dataset name")
     parser.add_argument("--jsonl", required=True, help="Path to JSONL file")
     parser.add_argument("--config", default="config", help="Config file with LANGFUSE_* keys")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel upload workers")
+    parser.add_argument("--rps", type=float, default=20.0, help="Max create requests per second")
     args = parser.parse_args()
 
     _load_env_from_config(args.config)
@@ -57,17 +111,23 @@ def main() -> int:
         base_url=os.getenv("LANGFUSE_BASE_URL", os.getenv("LANGFUSE_HOST")),
     )
 
-    items = _load_jsonl(args.jsonl)
-    for item in items:
-        request = CreateDatasetItemRequest(
-            dataset_name=args.dataset,
-            input=item.get("input"),
-            expected_output=item.get("expected_output"),
-            metadata=item.get("metadata"),
-            id=item.get("id"),
-        )
-        langfuse.api.dataset_items.create(request=request)
-        print(f"[added] {item.get('id') or 'auto-id'}")
+    limiter = _RateLimiter(args.rps)
+    workers = max(1, args.concurrency)
+    added = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending: set = set()
+        # Keep a bounded window of in-flight items so the JSONL stays streamed.
+        for item in _iter_jsonl(args.jsonl):
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    added += 1
+                    print(f"[added {added}] {fut.result()}")
+            pending.add(pool.submit(_create_item, langfuse, limiter, args.dataset, item))
+        for fut in wait(pending).done:
+            added += 1
+            print(f"[added {added}] {fut.result()}")
+    langfuse.flush()
 
     return 0
 
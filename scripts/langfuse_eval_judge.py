@@ -2,15 +2,53 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import json
 import os
 import re
+import queue
 import sys
-from typing import Any, Dict, Optional
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional
 
 import boto3
+from botocore.config import Config
 from langfuse import Langfuse
-from langfuse.api.resources.score.types.create_score_request import CreateScoreRequest
+
+try:
+    from jsonschema import Draft7Validator
+except ImportError:  # pragma: no cover
+    Draft7Validator = None  # type: ignore
+
+try:
+    from diskcache import Cache
+except ImportError:  # pragma: no cover
+    Cache = None  # type: ignore
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+
+def _dumps(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(obj, ensure_ascii=False)
+
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _as_prompt_text(value: Any) -> str:
+    # Plain strings go into the judge prompt as-is; JSON-encoding them only
+    # adds quotes and escapes (and tokens).
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    return _dumps(value)
 
 
 def _load_env_from_config(path: str) -> None:
@@ -42,30 +80,36 @@ OUTPUT_SCHEMA = {
 }
 
 
+# Compiled once; jsonschema is optional, with a hand-rolled fallback that
+# mirrors OUTPUT_SCHEMA using precomputed constants.
+_VALIDATOR = Draft7Validator(OUTPUT_SCHEMA) if Draft7Validator is not None else None
+_PRICE_TRENDS = frozenset(OUTPUT_SCHEMA["properties"]["price_trend"]["enum"])
+_ALLOWED_FIELDS = frozenset(OUTPUT_SCHEMA["properties"])
+
+
 def _validate_output_schema(output_obj: Any) -> Optional[str]:
+    if _VALIDATOR is not None:
+        errors = [e.message for e in _VALIDATOR.iter_errors(output_obj)]
+        return "; ".join(errors) if errors else None
     if not isinstance(output_obj, dict):
         return "Output is not a JSON object."
     for key in OUTPUT_SCHEMA["required"]:
         if key not in output_obj:
             return f"Missing required field: {key}"
-    if "price_trend" in output_obj:
-        if output_obj["price_trend"] not in OUTPUT_SCHEMA["properties"]["price_trend"]["enum"]:
-            return "Invalid price_trend value."
-    if not OUTPUT_SCHEMA["properties"]["summary"]["type"] == "string":
-        return "Invalid schema configuration."
-    if not isinstance(output_obj.get("summary"), str):
+    if output_obj["price_trend"] not in _PRICE_TRENDS:
+        return "Invalid price_trend value."
+    if not isinstance(output_obj["summary"], str):
         return "summary must be a string."
-    if "time_range" in output_obj and not isinstance(output_obj.get("time_range"), str):
+    if "time_range" in output_obj and not isinstance(output_obj["time_range"], str):
         return "time_range must be a string."
     if "sources_used" in output_obj:
         if not isinstance(output_obj["sources_used"], list) or not all(
             isinstance(v, str) for v in output_obj["sources_used"]
         ):
             return "sources_used must be an array of strings."
-    if OUTPUT_SCHEMA["additionalProperties"] is False:
-        extra = set(output_obj.keys()) - set(OUTPUT_SCHEMA["properties"].keys())
-        if extra:
-            return f"Unexpected fields: {sorted(extra)}"
+    extra = output_obj.keys() - _ALLOWED_FIELDS
+    if extra:
+        return f"Unexpected fields: {sorted(extra)}"
     return None
 
 
@@ -83,20 +127,33 @@ def _judge_prompt(
     )
 
 
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+
 def _extract_json(text: str) -> Dict[str, Any]:
-    text = text.strip()
     try:
-        return json.loads(text)
+        return _loads(text)
     except Exception:
         pass
-    match = re.search(r"\{.*\}", text, flags=re.DOTALL)
+    match = _JSON_OBJECT_RE.search(text)
     if not match:
-        raise ValueError(f"No JSON found in judge response: {text}")
-    return json.loads(match.group(0))
+        raise ValueError(f"No JSON found in judge response: {text.strip()}")
+    return _loads(match.group(0))
+
+
+@functools.lru_cache(maxsize=4)
+def _get_bedrock_client(region: str):
+    # Shared by all judge workers (boto3 clients are thread-safe); the pool is
+    # sized above the default 10 so --concurrency isn't capped by it.
+    return boto3.client(
+        "bedrock-runtime",
+        region_name=region,
+        config=Config(max_pool_connections=64, retries={"max_attempts": 5, "mode": "adaptive"}),
+    )
 
 
 def _call_bedrock(model_id: str, prompt: str) -> Dict[str, Any]:
-    client = boto3.client("bedrock-runtime", region_name=os.getenv("AWS_REGION", "us-east-2"))
+    client = _get_bedrock_client(os.getenv("AWS_REGION", "us-east-2"))
     response = client.converse(
         modelId=model_id,
         messages=[{"role": "user", "content": [{"text": prompt}]}],
@@ -106,13 +163,30 @@ def _call_bedrock(model_id: str, prompt: str) -> Dict[str, Any]:
     return _extract_json(content)
 
 
+# Set in main() from --tools-cache; tool summaries of a finished trace never
+# change, so re-runs (e.g. while iterating on the judge prompt) skip the
+# observations round trip. Delete the directory to invalidate.
+_TOOLS_CACHE: Optional[Any] = None
+
+
 def _summarize_tools(langfuse: Langfuse, trace_id: str) -> str:
+    if _TOOLS_CACHE is not None:
+        cached = _TOOLS_CACHE.get(trace_id)
+        if cached is not None:
+            return cached
     try:
         obs = langfuse.api.observations.get_many(trace_id=trace_id, limit=200)
     except Exception:
         return "Unavailable"
+    summary = _tools_summary_text(obs.data)
+    if _TOOLS_CACHE is not None:
+        _TOOLS_CACHE.set(trace_id, summary)
+    return summary
+
+
+def _tools_summary_text(observations: Any) -> str:
     tools = []
-    for item in obs.data:
+    for item in observations:
         name = (item.name or "").lower()
         if "tool" in name or "fetch_price_history" in name or "fetch_fake_price_history" in name:
             tools.append(
@@ -124,7 +198,110 @@ def _summarize_tools(langfuse: Langfuse, trace_id: str) -> str:
             )
     if not tools:
         return "No tool observations found."
-    return json.dumps(tools, ensure_ascii=False)
+    return _dumps(tools)
+
+
+_PRINT_LOCK = threading.Lock()
+_END_OF_ITEMS = object()
+
+
+def _iter_run_items(
+    langfuse: Langfuse, dataset_id: str, run_name: str, limit: int = 200
+) -> Iterator[Any]:
+    """Yield dataset run items while a background thread fetches the next pages."""
+    buffer: queue.Queue = queue.Queue(maxsize=2 * limit)
+    errors: List[BaseException] = []
+
+    def _produce() -> None:
+        try:
+            page = 1
+            while True:
+                result = langfuse.api.dataset_run_items.list(
+                    dataset_id=dataset_id, run_name=run_name, page=page, limit=limit
+                )
+                for run_item in result.data:
+                    buffer.put(run_item)
+                # Stop on total_pages rather than a short page, in case the
+                # server caps the page size below the requested limit.
+                total_pages = getattr(getattr(result, "meta", None), "total_pages", None)
+                if not result.data:
+                    break
+                if total_pages is not None and page >= total_pages:
+                    break
+                if total_pages is None and len(result.data) < limit:
+                    break
+                page += 1
+        except BaseException as exc:  # re-raised in the consumer
+            errors.append(exc)
+        finally:
+            buffer.put(_END_OF_ITEMS)
+
+    threading.Thread(target=_produce, name="run-item-prefetch", daemon=True).start()
+    while True:
+        run_item = buffer.get()
+        if run_item is _END_OF_ITEMS:
+            break
+        yield run_item
+    if errors:
+        raise errors[0]
+
+
+def _score_item(
+    run_item: Any, langfuse: Langfuse, item_map: Dict[str, Any], args: argparse.Namespace
+) -> None:
+    trace_id = run_item.trace_id
+    if not trace_id:
+        return
+    try:
+        trace = langfuse.api.trace.get(trace_id)
+    except Exception as exc:
+        with _PRINT_LOCK:
+            print(f"[skip] trace not found: {trace_id} ({exc})", file=sys.stderr)
+        return
+    item = item_map.get(run_item.dataset_item_id)
+    input_text = _as_prompt_text(trace.input)
+    output_text = _as_prompt_text(trace.output)
+    expected = _as_prompt_text(item.expected_output) if item is not None else ""
+
+    # trace.output is already decoded JSON: validate it as-is rather than
+    # re-parsing output_text.
+    schema_error = None
+    try:
+        if trace.output is not None:
+            schema_error = _validate_output_schema(trace.output)
+    except Exception as exc:
+        schema_error = f"Invalid JSON output: {exc}"
+
+    # create_score only enqueues; the SDK posts scores in batches from its
+    # background ingestion worker, flushed at the end of main().
+    langfuse.create_score(
+        name="schema_valid",
+        value=0 if schema_error else 1,
+        trace_id=trace_id,
+        data_type="BOOLEAN",
+        comment=schema_error or "Output matches schema.",
+        metadata={"schema": "price_history_summary_v1"},
+    )
+
+    tools_summary = _summarize_tools(langfuse, trace_id)
+    judge = _call_bedrock(
+        args.judge_model_id,
+        _judge_prompt(input_text, output_text, expected, tools_summary),
+    )
+    score_val = float(judge.get("score", 0))
+    label = str(judge.get("label", ""))
+    rationale = str(judge.get("rationale", ""))
+
+    langfuse.create_score(
+        name=args.score_name,
+        value=score_val,
+        trace_id=trace_id,
+        data_type="NUMERIC",
+        comment=rationale,
+        metadata={"label": label, "judge_model_id": args.judge_model_id},
+    )
+    with _PRINT_LOCK:
+        print(f"[scored] trace={trace_id} score={score_val} label={label} schema_ok={schema_error is None}")
 
 
 def main() -> int:
@@ -146,9 +323,23 @@ def main() -> int:
         default="config",
         help="Path to config file with LANGFUSE_* keys (default: ./config)",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=16,
+        help="Dataset run items judged in parallel (default: 16)",
+    )
+    parser.add_argument(
+        "--tools-cache",
+        default=".tools_cache",
+        help="diskcache directory for per-trace tool summaries ('' disables; needs diskcache)",
+    )
     args = parser.parse_args()
 
     _load_env_from_config(args.config)
+    global _TOOLS_CACHE
+    if args.tools_cache and Cache is not None:
+        _TOOLS_CACHE = Cache(args.tools_cache)
     if not args.judge_model_id:
         print("Missing judge model id. Set --judge-model-id or JUDGE_MODEL_ID.", file=sys.stderr)
         return 1
@@ -161,86 +352,21 @@ def main() -> int:
     dataset = langfuse.get_dataset(args.dataset)
     item_map = {item.id: item for item in dataset.items}
 
-    page = 1
-    limit = 50
-    while True:
-        result = langfuse.api.dataset_run_items.list(
-            dataset_id=dataset.id, run_name=args.run_name, page=page, limit=limit
-        )
-        if not result.data:
-            break
-
-        for run_item in result.data:
-            trace_id = run_item.trace_id
-            if not trace_id:
-                continue
-            try:
-                trace = langfuse.api.trace.get(trace_id)
-            except Exception as exc:
-                print(f"[skip] trace not found: {trace_id} ({exc})", file=sys.stderr)
-                continue
-            item = item_map.get(run_item.dataset_item_id)
-            input_text = json.dumps(trace.input, ensure_ascii=False) if trace.input is not None else ""
-            output_text = json.dumps(trace.output, ensure_ascii=False) if trace.output is not None else ""
-            expected = ""
-            if item is not None and item.expected_output is not None:
-                expected = json.dumps(item.expected_output, ensure_ascii=False)
-
-            schema_error = None
-            try:
-                output_obj = json.loads(output_text) if output_text else None
-                if output_obj is not None:
-                    schema_error = _validate_output_schema(output_obj)
-            except Exception as exc:
-                schema_error = f"Invalid JSON output: {exc}"
-
-            if schema_error:
-                langfuse.api.score.create(
-                    request=CreateScoreRequest(
-                        name="schema_valid",
-                        value=0,
-                        trace_id=trace_id,
-                        data_type="BOOLEAN",
-                        comment=schema_error,
-                        metadata={"schema": "price_history_summary_v1"},
-                    )
-                )
-            else:
-                langfuse.api.score.create(
-                    request=CreateScoreRequest(
-                        name="schema_valid",
-                        value=1,
-                        trace_id=trace_id,
-                        data_type="BOOLEAN",
-                        comment="Output matches schema.",
-                        metadata={"schema": "price_history_summary_v1"},
-                    )
-                )
-
-            tools_summary = _summarize_tools(langfuse, trace_id)
-            judge = _call_bedrock(
-                args.judge_model_id,
-                _judge_prompt(input_text, output_text, expected, tools_summary),
-            )
-            score_val = float(judge.get("score", 0))
-            label = str(judge.get("label", ""))
-            rationale = str(judge.get("rationale", ""))
-
-            langfuse.api.score.create(
-                request=CreateScoreRequest(
-                    name=args.score_name,
-                    value=score_val,
-                    trace_id=trace_id,
-                    data_type="NUMERIC",
-                    comment=rationale,
-                    metadata={"label": label, "judge_model_id": args.judge_model_id},
-                )
-            )
-            print(f"[scored] trace={trace_id} score={score_val} label={label} schema_ok={schema_error is None}")
-
-        if len(result.data) < limit:
-            break
-        page += 1
+    # Each item is a chain of network calls (trace fetch, tool summary,
+    # Bedrock, scores), so items are judged concurrently while the next
+    # pages are prefetched.
+    workers = max(1, args.concurrency)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending: set = set()
+        for run_item in _iter_run_items(langfuse, dataset.id, args.run_name):
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    fut.result()
+            pending.add(pool.submit(_score_item, run_item, langfuse, item_map, args))
+        for fut in wait(pending).done:
+            fut.result()
+    langfuse.flush()
 
     return 0
 
@@ -4,12 +4,18 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import random
 import sys
+import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Dict, Optional
 
 import requests
 from langfuse import Langfuse
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 
 
 def _load_env_from_config(path: str) -> None:
@@ -40,6 +46,45 @@ def _validate_input_schema(item_input: Any, input_key: str) -> str:
     return prompt
 
 
+_PRINT_LOCK = threading.Lock()
+
+
+def _make_session() -> requests.Session:
+    # Pooled keep-alive connections shared by the worker threads. Only failed
+    # connects are retried here; 5xx handling stays in _post_chat.
+    adapter = HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=64,
+        max_retries=Retry(total=None, connect=3, read=0, status=0, other=0, backoff_factor=0.5),
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_SESSION = _make_session()
+
+
+class _RateLimiter:
+    """Spaces acquisitions to at most `rps` per second across threads."""
+
+    def __init__(self, rps: float) -> None:
+        self._interval = 1.0 / rps if rps > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self._interval
+        if delay > 0:
+            time.sleep(delay)
+
+
 def _post_chat(
     api_url: str,
     payload: Dict[str, Any],
@@ -51,7 +96,7 @@ def _post_chat(
     last_exc: Optional[Exception] = None
     for attempt in range(1, max_retries + 1):
         try:
-            resp = requests.post(api_url, json=payload, timeout=timeout)
+            resp = _SESSION.post(api_url, json=payload, timeout=timeout)
             if resp.status_code >= 500:
                 body = resp.text or ""
                 if "Concurrent" in body or "already processing" in body:
@@ -65,15 +110,63 @@ def _post_chat(
         except Exception as exc:
             last_exc = exc
             if attempt < max_retries:
-                import time
-
-                print(f"[retry] attempt={attempt} error={exc}")
-                time.sleep(retry_wait)
+                # Exponential backoff with full jitter, capped at 2x retry_wait:
+                # quick recovery from blips without workers retrying in lockstep.
+                delay = random.uniform(0, min(retry_wait * 2, 2 ** (attempt - 1)))
+                with _PRINT_LOCK:
+                    print(f"[retry] attempt={attempt} wait={delay:.1f}s error={exc}")
+                time.sleep(delay)
                 continue
             raise
     raise last_exc or RuntimeError("Request failed")
 
 
+def _run_one(item: Any, args: argparse.Namespace, limiter: _RateLimiter) -> None:
+    prompt = _validate_input_schema(item.input, args.input_key)
+    limiter.acquire()
+    # Runtime requires session_id length >= 33; ensure unique, valid length.
+    session_id = f"{args.run_name}:{item.id}:{uuid.uuid4().hex}"
+    payload = {
+        "user_id": args.user_id,
+        "message": prompt,
+        "session_id": session_id,
+    }
+
+    with item.run(run_name=args.run_name) as span:
+        span.update(input=item.input, metadata={"dataset_item_id": item.id})
+        try:
+            response = _post_chat(
+                args.api_url,
+                payload,
+                timeout=args.timeout,
+                max_retries=args.max_retries,
+                retry_wait=args.retry_wait,
+            )
+            reply = response.get("reply") or response.get("response") or response
+            span.update(output=reply)
+            span.update_trace(
+                input=item.input,
+                output=reply,
+                metadata={
+                    "dataset_item_id": item.id,
+                    "dataset_name": args.dataset,
+                    "run_name": args.run_name,
+                },
+            )
+        except Exception as exc:
+            span.update(
+                level="ERROR",
+                status_message=str(exc),
+                metadata={
+                    "dataset_item_id": item.id,
+                    "dataset_name": args.dataset,
+                    "run_name": args.run_name,
+                },
+            )
+            with _PRINT_LOCK:
+                print(f"[ERROR] item={item.id} prompt={prompt}: {exc}", file=sys.stderr)
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description="Run a Langfuse dataset against the live agent API.")
     parser.add_argument("--dataset", required=True, help="Langfuse dataset name")
@@ -95,8 +188,9 @@ def main() -> int:
     )
     parser.add_argument("--timeout", type=int, default=180, help="Request timeout seconds")
     parser.add_argument("--max-retries", type=int, default=12, help="Retries on 5xx")
-    parser.add_argument("--retry-wait", type=float, default=15.0, help="Seconds between retries")
-    parser.add_argument("--sleep-between", type=float, default=5.0, help="Sleep between items")
+    parser.add_argument("--retry-wait", type=float, default=15.0, help="Backoff cap is 2x this many seconds")
+    parser.add_argument("--concurrency", type=int, default=4, help="Dataset items run in parallel")
+    parser.add_argument("--qps", type=float, default=1.0, help="Max chat requests started per second")
     parser.add_argument(
         "--config",
         default="config",
@@ -115,52 +209,16 @@ def main() -> int:
         print(f"No items found in dataset '{args.dataset}'.")
         return 1
 
+    # Validate every item up front so a bad one fails the run before any
+    # chat calls are made.
     for item in dataset.items:
-        prompt = _validate_input_schema(item.input, args.input_key)
-        # Runtime requires session_id length >= 33; ensure unique, valid length.
-        session_id = f"{args.run_name}:{item.id}:{uuid.uuid4().hex}"
-        payload = {
-            "user_id": args.user_id,
-            "message": prompt,
-            "session_id": session_id,
-        }
-
-        with item.run(run_name=args.run_name) as span:
-            span.update(input=item.input, metadata={"dataset_item_id": item.id})
-            try:
-                response = _post_chat(
-                    args.api_url,
-                    payload,
-                    timeout=args.timeout,
-                    max_retries=args.max_retries,
-                    retry_wait=args.retry_wait,
-                )
-                reply = response.get("reply") or response.get("response") or response
-                span.update(output=reply)
-                span.update_trace(
-                    input=item.input,
-                    output=reply,
-                    metadata={
-                        "dataset_item_id": item.id,
-                        "dataset_name": args.dataset,
-                        "run_name": args.run_name,
-                    },
-                )
-            except Exception as exc:
-                span.update(
-                    level="ERROR",
-                    status_message=str(exc),
-                    metadata={
-                        "dataset_item_id": item.id,
-                        "dataset_name": args.dataset,
-                        "run_name": args.run_name,
-                    },
-                )
-                print(f"[ERROR] item={item.id} prompt={prompt}: {exc}", file=sys.stderr)
-        if args.sleep_between:
-            import time
+        _validate_input_schema(item.input, args.input_key)
 
-            time.sleep(args.sleep_between)
+    limiter = _RateLimiter(args.qps)
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+        for _ in pool.map(lambda item: _run_one(item, args, limiter), dataset.items):
+            pass
+    langfuse.flush()
 
     return 0
 
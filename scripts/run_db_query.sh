@@ -173,6 +173,10 @@ fi
 : "${DB_PORT:=5432}"
 : "${DB_NAME:=poke}"
 : "${DB_USER:?DB_USER missing}"
+# The RDS Proxy takes IAM tokens only; sign one with the task role.
+if [[ "${DB_IAM_AUTH:-}" == "1" ]]; then
+  DB_PASSWORD="$(python3 -c 'import sys, boto3; h, p, u = sys.argv[1:]; print(boto3.client("rds").generate_db_auth_token(h, int(p), u))' "$DB_HOST" "$DB_PORT" "$DB_USER")"
+fi
 : "${DB_PASSWORD:?DB_PASSWORD missing}"
 
 if command -v base64 >/dev/null 2>&1; then
@@ -20,10 +20,10 @@ fi
 
 task="$1"
 case "$task" in
-  universe_updater) logical_rule="UniverseUpdaterDailyRule" ;;
-  price_extractor) logical_rule="PriceExtractorDailyRule" ;;
-  strategy_runner) logical_rule="StrategyRunnerDailyRule" ;;
-  s3_exporter) logical_rule="S3ExporterDailyRule" ;;
+  universe_updater) logical_rule="UniverseUpdaterDailyRule"; target_id="UniverseUpdaterEcsTarget" ;;
+  price_extractor) logical_rule="PriceExtractorDailyRule"; target_id="PriceExtractorEcsTarget" ;;
+  strategy_runner) logical_rule="StrategyRunnerDailyRule"; target_id="StrategyRunnerEcsTarget" ;;
+  s3_exporter) logical_rule="S3ExporterDailyRule"; target_id="S3ExporterEcsTarget" ;;
   *) usage; exit 1 ;;
 esac
 
@@ -42,11 +42,11 @@ fi
 
 echo "Resolved RULE_NAME: $rule_name"
 
-cluster_arn="$(aws_cmd events list-targets-by-rule --rule "$rule_name" --query "Targets[0].Arn" --output text)"
-task_def="$(aws_cmd events list-targets-by-rule --rule "$rule_name" --query "Targets[0].EcsParameters.TaskDefinitionArn" --output text)"
-subnets="$(aws_cmd events list-targets-by-rule --rule "$rule_name" --query "Targets[0].EcsParameters.NetworkConfiguration.awsvpcConfiguration.Subnets" --output text)"
-security_groups="$(aws_cmd events list-targets-by-rule --rule "$rule_name" --query "Targets[0].EcsParameters.NetworkConfiguration.awsvpcConfiguration.SecurityGroups" --output text)"
-assign_public_ip="$(aws_cmd events list-targets-by-rule --rule "$rule_name" --query "Targets[0].EcsParameters.NetworkConfiguration.awsvpcConfiguration.AssignPublicIp" --output text)"
+cluster_arn="$(aws_cmd events list-targets-by-rule --rule "$rule_name" --query "Targets[?Id=='${target_id}'] | [0].Arn" --output text)"
+task_def="$(aws_cmd events list-targets-by-rule --rule "$rule_name" --query "Targets[?Id=='${target_id}'] | [0].EcsParameters.TaskDefinitionArn" --output text)"
+subnets="$(aws_cmd events list-targets-by-rule --rule "$rule_name" --query "Targets[?Id=='${target_id}'] | [0].EcsParameters.NetworkConfiguration.awsvpcConfiguration.Subnets" --output text)"
+security_groups="$(aws_cmd events list-targets-by-rule --rule "$rule_name" --query "Targets[?Id=='${target_id}'] | [0].EcsParameters.NetworkConfiguration.awsvpcConfiguration.SecurityGroups" --output text)"
+assign_public_ip="$(aws_cmd events list-targets-by-rule --rule "$rule_name" --query "Targets[?Id=='${target_id}'] | [0].EcsParameters.NetworkConfiguration.awsvpcConfiguration.AssignPublicIp" --output text)"
 
 if [[ -z "$cluster_arn" || "$cluster_arn" == "None" ]]; then
   echo "Cluster ARN not found from rule target."
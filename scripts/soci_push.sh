@@ -0,0 +1,70 @@
+#!/usr/bin/env bash
+set -euo pipefail
+
+# Build and push SOCI (Seekable OCI) indexes for the platform images so Fargate
+# can lazy-load them instead of pulling every layer before the task starts.
+# Run after each `docker push`; Fargate (platform 1.4.0) detects the index in
+# the same ECR repository with no task definition change.
+# Requires: containerd (ctr) and the soci CLI from soci-snapshotter.
+
+REGION="${REGION:-us-east-2}"
+STACK="${STACK:-PokePlatformStack}"
+TAG="${TAG:-latest}"
+SPAN_SIZE="${SPAN_SIZE:-4194304}"  # 4 MiB, soci's default span size
+
+aws_cmd() {
+  aws --region "$REGION" "$@"
+}
+
+usage() {
+  echo "Usage: $0 [component ...]"
+  echo "Components: api | ui | proposal_generator | strategy_runner | universe_updater | price_extractor | s3_exporter"
+  echo "With no arguments, indexes every component."
+}
+
+output_key() {
+  case "$1" in
+    api) echo "ApiRepoUri" ;;
+    ui) echo "UiRepoUri" ;;
+    proposal_generator) echo "ProposalGeneratorRepoUri" ;;
+    strategy_runner) echo "StrategyRunnerRepoUri" ;;
+    universe_updater) echo "UniverseUpdaterRepoUri" ;;
+    price_extractor) echo "PriceExtractorRepoUri" ;;
+    s3_exporter) echo "S3ExporterRepoUri" ;;
+    *) return 1 ;;
+  esac
+}
+
+if [[ "${1:-}" == "-h" || "${1:-}" == "--help" ]]; then
+  usage
+  exit 0
+fi
+
+components=("$@")
+if [[ ${#components[@]} -eq 0 ]]; then
+  components=(api ui proposal_generator strategy_runner universe_updater price_extractor s3_exporter)
+fi
+
+password="$(aws_cmd ecr get-login-password)"
+
+for component in "${components[@]}"; do
+  if ! key="$(output_key "$component")"; then
+    usage
+    exit 1
+  fi
+
+  repo_uri="$(aws_cmd cloudformation describe-stacks \
+    --stack-name "$STACK" \
+    --query "Stacks[0].Outputs[?OutputKey=='${key}'].OutputValue" \
+    --output text)"
+  if [[ -z "$repo_uri" || "$repo_uri" == "None" ]]; then
+    echo "Output $key not found in stack $STACK."
+    exit 1
+  fi
+
+  image="${repo_uri}:${TAG}"
+  echo "Indexing $image"
+  sudo ctr image pull --user "AWS:${password}" "$image" >/dev/null
+  sudo soci create --span-size "$SPAN_SIZE" "$image"
+  sudo soci push --user "AWS:${password}" "$image"
+done
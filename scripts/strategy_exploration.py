@@ -31,8 +31,10 @@
 
 
 import os
+import uuid
 from collections import defaultdict
 from datetime import date, timedelta
+from typing import Iterable, Iterator
 
 import psycopg2
 
@@ -42,32 +44,67 @@ MIN_MARKET_PRICE = float(os.getenv("SES_MIN_PRICE", "0"))
 
 PREFERRED_VARIANTS = ["normal", "reverseHolofoil", "holofoil"]
 
+DB_HOST = os.environ.get("DB_HOST")
+DB_PORT = int(os.environ.get("DB_PORT", "5432"))
+DB_NAME = os.environ.get("DB_NAME", "poke")
+DB_USER = os.environ.get("DB_USER")
+DB_PASSWORD = os.environ.get("DB_PASSWORD")
+DB_IAM_AUTH = os.environ.get("DB_IAM_AUTH") == "1"
+
+
+def db_password():
+    # Via the RDS Proxy (DB_IAM_AUTH=1) the password is a 15-minute IAM token.
+    if not DB_IAM_AUTH:
+        return DB_PASSWORD
+    import boto3
+
+    return boto3.client("rds").generate_db_auth_token(DB_HOST, DB_PORT, DB_USER)
+
 
 def connect():
     return psycopg2.connect(
-        host=os.environ["DB_HOST"],
-        port=int(os.environ.get("DB_PORT", "5432")),
-        dbname=os.environ.get("DB_NAME", "poke"),
-        user=os.environ["DB_USER"],
-        password=os.environ["DB_PASSWORD"],
+        host=DB_HOST,
+        port=DB_PORT,
+        dbname=DB_NAME,
+        user=DB_USER,
+        password=db_password(),
         connect_timeout=10,
     )
 
 
-def fetch_price_history(conn, start_date: date):
-    with conn.cursor() as cur:
+# The busiest asset in the window is picked in Postgres, so only its
+# O(lookback days) rows cross the wire instead of every asset's history.
+SAMPLE_PRICE_HISTORY_SQL = """
+    WITH window_rows AS (
+        SELECT t.snapshot_date, t.asset_id, t.variant, t.market
+        FROM tcgplayer_price_snapshot t
+        WHERE t.snapshot_date >= %(start_date)s
+          AND t.market IS NOT NULL
+          AND t.market > %(min_price)s
+    ),
+    picked AS (
+        SELECT asset_id
+        FROM window_rows
+        GROUP BY asset_id
+        ORDER BY COUNT(*) DESC, asset_id
+        LIMIT 1
+    )
+    SELECT w.snapshot_date, w.asset_id, w.variant, w.market
+    FROM window_rows w
+    WHERE w.asset_id = (SELECT asset_id FROM picked)
+    ORDER BY w.variant, w.snapshot_date;
+"""
+
+
+def fetch_sample_price_history(conn, start_date: date, itersize: int = 10_000) -> Iterator[tuple]:
+    """Stream rows through a server-side cursor, `itersize` rows per round-trip."""
+    with conn.cursor(name=f"ses_{uuid.uuid4().hex}") as cur:
+        cur.itersize = itersize
         cur.execute(
-            """
-            SELECT t.snapshot_date, t.asset_id, t.variant, t.market
-            FROM tcgplayer_price_snapshot t
-            WHERE t.snapshot_date >= %s
-              AND t.market IS NOT NULL
-              AND t.market > %s
-            ORDER BY t.asset_id, t.variant, t.snapshot_date;
-            """,
-            (start_date, MIN_MARKET_PRICE),
+            SAMPLE_PRICE_HISTORY_SQL,
+            {"start_date": start_date, "min_price": MIN_MARKET_PRICE},
         )
-        return cur.fetchall()
+        yield from cur
 
 
 def choose_variant(variants: dict, target_date: date):
@@ -91,31 +128,32 @@ def compute_ses(prices: list[tuple], alpha: float):
     return s, float(prices[-1][1])
 
 
+def _sample_from_rows(rows: Iterable[tuple]):
+    sample_asset = None
+    variants = defaultdict(list)
+    for snap_date, sample_asset, variant, market in rows:
+        variants[variant].append((snap_date, market))
+    if sample_asset is None:
+        return None
+
+    variant, price_rows = choose_variant(variants, date.today())
+    smooth_price, market_price = compute_ses(price_rows, DEFAULT_ALPHA)
+    return sample_asset, variant, price_rows, smooth_price, market_price
+
+
 def main():
     conn = connect()
     try:
         start_date = date.today() - timedelta(days=LOOKBACK_DAYS)
-        rows = fetch_price_history(conn, start_date)
-        if not rows:
+        sample = _sample_from_rows(fetch_sample_price_history(conn, start_date))
+        if sample is None:
             print("No price history found for the lookback window.")
             return
-
-        asset_variants = defaultdict(lambda: defaultdict(list))
-        for snap_date, asset_id, variant, market in rows:
-            asset_variants[asset_id][variant].append((snap_date, market))
-
-        sample_asset = max(
-            asset_variants.items(),
-            key=lambda kv: sum(len(v) for v in kv[1].values()),
-        )[0]
-
-        variant, price_rows = choose_variant(asset_variants[sample_asset], date.today())
-        price_rows.sort(key=lambda r: r[0])
+        sample_asset, variant, price_rows, smooth_price, market_price = sample
         if not price_rows:
             print("No price rows found for sample asset.")
             return
 
-        smooth_price, market_price = compute_ses(price_rows, DEFAULT_ALPHA)
         gap = smooth_price - market_price
         gap_pct = gap / market_price if market_price else 0
 
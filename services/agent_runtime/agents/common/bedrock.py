@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import os
+import functools
+from typing import TYPE_CHECKING
+
+from botocore.config import Config
+
+if TYPE_CHECKING:
+    from strands.models import BedrockModel
+
+
+DEFAULT_MODEL_ID = "global.anthropic.claude-haiku-4-5-20251001-v1:0"
+
+
+@functools.lru_cache(maxsize=None)
+def boto_client_config(region: str) -> Config:
+    """
+    One botocore Config for every Bedrock/AWS client in the process: a pool
+    large enough for concurrent tool calls, adaptive retries, TCP keepalive.
+    """
+    return Config(
+        region_name=region,
+        max_pool_connections=int(os.getenv("AWS_MAX_CONN", "32")),
+        retries={"max_attempts": 3, "mode": "adaptive"},
+        tcp_keepalive=True,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def bedrock_model(region: str, temperature: float, streaming: bool = False) -> BedrockModel:
+    """
+    Build (once per region/temperature/streaming) the BedrockModel shared by the agents,
+    so rebuilding an agent reuses the model's HTTPS connection pool.
+    """
+    from strands.models import BedrockModel
+
+    return BedrockModel(
+        model_id=os.getenv("BEDROCK_MODEL_ID", DEFAULT_MODEL_ID),
+        region_name=region,
+        temperature=temperature,
+        streaming=streaming,
+        boto_client_config=boto_client_config(region),
+    )
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+import math
+from typing import Any, Dict, Optional, Sequence
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore
+
+
+if orjson is not None:
+
+    def dumps(obj: Any) -> str:
+        """Serialize to a JSON str using orjson's C encoder."""
+        return orjson.dumps(obj).decode("utf-8")
+
+else:
+    dumps = json.dumps  # type: ignore[assignment]
+
+# Accepts str or bytes either way.
+loads = orjson.loads if orjson is not None else json.loads
+
+
+def _encode(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value).encode("utf-8")
+
+
+def _encode_price(price: Optional[float]) -> bytes:
+    if price is None or not math.isfinite(price):
+        return b"null"
+    return repr(float(price)).encode("ascii")
+
+
+def dump_price_payload(
+    card_name: str,
+    market: str,
+    source: str,
+    dates: Sequence[str],
+    prices: Sequence[Optional[float]],
+    currencies: Sequence[Optional[str]],
+) -> str:
+    """
+    Serialize a price-history tool payload from parallel columns:
+      {"card_name": ..., "market": ..., "prices": [{"date", "price", "currency", "market"}, ...], "source": ...}
+
+    Keys and the per-row market fragment are encoded once; rows are appended
+    to one buffer without building intermediate dicts.
+    """
+    market_b = _encode(market)
+    row_tail = b',"market":' + market_b + b"}"
+    currency_cache: Dict[Optional[str], bytes] = {}
+
+    buf = bytearray(b'{"card_name":')
+    buf += _encode(card_name)
+    buf += b',"market":'
+    buf += market_b
+    buf += b',"prices":['
+    for i, (date, price, currency) in enumerate(zip(dates, prices, currencies)):
+        currency_b = currency_cache.get(currency)
+        if currency_b is None:
+            currency_b = currency_cache[currency] = _encode(currency)
+        if i:
+            buf += b","
+        # Dates come from to_char(..., 'YYYY-MM-DD') and never need escaping.
+        buf += b'{"date":"'
+        buf += date.encode("ascii")
+        buf += b'","price":'
+        buf += _encode_price(price)
+        buf += b',"currency":'
+        buf += currency_b
+        buf += row_tail
+    buf += b'],"source":'
+    buf += _encode(source)
+    buf += b"}"
+    return buf.decode("utf-8")
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import List
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover
+    njit = None  # type: ignore
+
+
+def _ramp_py(n: int) -> np.ndarray:
+    out = np.empty(n)
+    for i in range(n):
+        out[i] = 10.0 + i
+    return out
+
+
+# Compiled ahead of the first call (explicit signature + on-disk cache) when
+# numba is installed; otherwise the same loop runs as plain Python.
+_ramp = njit("float64[:](int64)", cache=True)(_ramp_py) if njit is not None else _ramp_py
+
+
+def ramp(n: int) -> np.ndarray:
+    """Return [10.0, 11.0, ..., 10.0 + n - 1] as float64."""
+    return _ramp(np.int64(n))
+
+
+def iso_dates_ending(end: dt.date, n: int) -> List[str]:
+    """Return the n consecutive ISO dates ending at `end` (inclusive), oldest first."""
+    last = np.datetime64(end, "D")
+    return np.datetime_as_string(np.arange(last - (n - 1), last + 1)).tolist()
@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+import os
+
+# Resolved once at import. POKE_REGION is the same variable the CDK app reads,
+# so the runtime can't silently drift to a different region than the stack.
+REGION: str = (
+    os.getenv("POKE_REGION")
+    or os.getenv("AWS_DEFAULT_REGION")
+    or os.getenv("AWS_REGION")
+    or "us-east-2"
+)
@@ -2,18 +2,22 @@ from __future__ import annotations
 
 import os
 import logging
-from typing import Optional, Dict, Any, List
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Optional, Any, Tuple
 
+from cachetools import TTLCache
 from strands import Agent, tool
-from strands.models import BedrockModel
 
+from agents.common.bedrock import bedrock_model
+from agents.common.json_utils import dump_price_payload, dumps as _dumps
 from agents.data_agent.db_tools import (
     load_postgres_config_from_env,
-    fetch_price_history_from_postgres,
+    fetch_price_columns_from_postgres,
 )
 from agents.data_agent.s3_tools import (
     load_s3_price_config_from_env,
-    fetch_price_history_from_s3_jsonl,
+    fetch_price_history_from_s3,
 )
 from observability.langfuse_client import load_langfuse_config_from_env, PromptProvider
 
@@ -31,19 +35,70 @@ Rules:
 - Output MUST be valid JSON (no markdown).
 """
 
+# Agent traces tend to ask for the same few cards repeatedly; keep the fetched
+# series for identical requests instead of re-querying DB/S3. Entries hold
+# Postgres columns or S3 records and are serialized per hit (source="cache",
+# the caller's card_name).
+_PRICE_CACHE: TTLCache = TTLCache(
+    maxsize=1024, ttl=int(os.getenv("PRICE_CACHE_TTL", "900"))
+)
+_PRICE_CACHE_LOCK = threading.RLock()
+
+# Shape returned when neither Postgres nor S3 has data; only the two string
+# fields vary, so they are substituted instead of serializing a fresh dict.
+_EMPTY_TMPL = '{{"card_name":{cn},"market":{m},"prices":[],"source":"none"}}'
+
+# S3 is a hedge behind Postgres: it is only started once Postgres misses or
+# has not answered within PRICE_HEDGE_DELAY seconds, and Postgres wins ties.
+# Cards that recently missed in Postgres go straight to S3.
+_FETCH_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="price-fetch")
+_HEDGE_DELAY = float(os.getenv("PRICE_HEDGE_DELAY", "0.3"))
+_DB_MISS_CACHE: TTLCache = TTLCache(
+    maxsize=1024, ttl=int(os.getenv("PRICE_CACHE_TTL", "900"))
+)
 
-def build_data_agent(region: str) -> Agent:
-    model_id = os.getenv(
-        "BEDROCK_MODEL_ID",
-        "global.anthropic.claude-haiku-4-5-20251001-v1:0",
-    )
-    model = BedrockModel(
-        model_id=model_id,
-        region_name=region,
-        temperature=0.0,
-        streaming=False,
+
+# (source, series): series is a (dates, prices, currencies) triple from
+# Postgres or a list of S3 price records.
+Fetched = Tuple[str, Any]
+
+
+def _price_payload(card_name: str, market: str, source: str, series: Any) -> str:
+    if isinstance(series, tuple):
+        return dump_price_payload(card_name, market, source, *series)
+    return _dumps(
+        {"card_name": card_name, "market": market, "prices": series, "source": source}
     )
 
+
+def _hedged_fetch(
+    pg_fetch: Callable[[], Optional[Fetched]], s3_fetch: Callable[[], Optional[Fetched]]
+) -> Optional[Fetched]:
+    """
+    Return Postgres' result, falling back to S3. S3 runs inline after a fast
+    Postgres miss, or concurrently once Postgres exceeds the hedge delay; the
+    first non-empty result wins, preferring Postgres.
+    """
+    pg_future = _FETCH_POOL.submit(pg_fetch)
+    wait([pg_future], timeout=_HEDGE_DELAY)
+    if pg_future.done():
+        result = pg_future.result()
+        return result if result is not None else s3_fetch()
+
+    s3_future = _FETCH_POOL.submit(s3_fetch)
+    pending = {pg_future, s3_future}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        if pg_future in done and pg_future.result() is not None:
+            return pg_future.result()
+        if s3_future in done and s3_future.result() is not None:
+            return s3_future.result()
+    return None
+
+
+def build_data_agent(region: str) -> Agent:
+    model = bedrock_model(region, temperature=0.0)
+
     lf_cfg = load_langfuse_config_from_env()
     if lf_cfg:
         provider = PromptProvider(lf_cfg)
@@ -77,14 +132,19 @@ def build_data_agent(region: str) -> Agent:
 
         Returns:
           JSON string:
-            {"card_name": "...", "market": "...", "prices":[{"date":"...","price":...,"currency":"..."}], "source":"postgres|s3|none"}
+            {"card_name": "...", "market": "...", "prices":[{"date":"...","price":...,"currency":"..."}], "source":"postgres|s3|cache|none"}
         """
-        prices: List[Dict[str, Any]] = []
-        source = "none"
+        key: Tuple[Any, ...] = (card_name.lower(), market, start_date, end_date, limit)
+        with _PRICE_CACHE_LOCK:
+            cached = _PRICE_CACHE.get(key)
+        if cached is not None:
+            return _price_payload(card_name, market, "cache", cached)
+
+        miss_key = (card_name.lower(), market)
 
-        if pg_cfg:
+        def from_postgres() -> Optional[Fetched]:
             try:
-                prices = fetch_price_history_from_postgres(
+                dates, prices, currencies = fetch_price_columns_from_postgres(
                     pg_cfg,
                     card_name=card_name,
                     market=market,
@@ -92,29 +152,45 @@ def build_data_agent(region: str) -> Agent:
                     end_date=end_date,
                     limit=limit,
                 )
-                source = "postgres"
             except Exception:
-                prices = []
-
-        if not prices and s3_cfg:
+                return None
+            if not dates:
+                with _PRICE_CACHE_LOCK:
+                    _DB_MISS_CACHE[miss_key] = True
+                return None
+            return "postgres", (dates, prices, currencies)
+
+        def from_s3() -> Optional[Fetched]:
             try:
-                prices = fetch_price_history_from_s3_jsonl(
+                records = fetch_price_history_from_s3(
                     s3_cfg, card_name=card_name, market=market, limit=limit
                 )
-                source = "s3" if prices else "none"
             except Exception:
-                prices = []
-
-        import json
-
-        return json.dumps(
-            {
-                "card_name": card_name,
-                "market": market,
-                "prices": prices,
-                "source": source,
-            }
-        )
+                return None
+            if not records:
+                return None
+            return "s3", records
+
+        with _PRICE_CACHE_LOCK:
+            known_db_miss = miss_key in _DB_MISS_CACHE
+
+        if pg_cfg and s3_cfg:
+            result = from_s3() if known_db_miss else _hedged_fetch(from_postgres, from_s3)
+        elif pg_cfg:
+            result = from_postgres()
+        elif s3_cfg:
+            result = from_s3()
+        else:
+            result = None
+
+        # Don't cache misses; an empty result may just be a transient DB/S3 failure.
+        if result is None:
+            return _EMPTY_TMPL.format(cn=_dumps(card_name), m=_dumps(market))
+
+        source, series = result
+        with _PRICE_CACHE_LOCK:
+            _PRICE_CACHE[key] = series
+        return _price_payload(card_name, market, source, series)
 
     agent = Agent(
         model=model,
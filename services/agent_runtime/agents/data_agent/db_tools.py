@@ -1,12 +1,22 @@
 from __future__ import annotations
 
 import os
+import functools
+import atexit
+import threading
+import time
 import datetime as dt
-from dataclasses import dataclass
-from typing import Optional, List, Dict, Any
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Optional, List, Dict, Any, Iterator, Set, Tuple
 
 import psycopg2
-import psycopg2.extras
+import psycopg2.extensions
+from psycopg2.pool import ThreadedConnectionPool
+
+
+# (dates, prices, currencies) as parallel lists.
+PriceColumns = Tuple[List[str], List[Optional[float]], List[Optional[str]]]
 
 
 @dataclass(frozen=True)
@@ -19,6 +29,7 @@ class PostgresConfig:
     sslmode: str = "require"
 
 
+@functools.lru_cache(maxsize=1)
 def load_postgres_config_from_env() -> Optional[PostgresConfig]:
     """
     Expected env vars (match your existing repo style):
@@ -41,56 +52,82 @@ def load_postgres_config_from_env() -> Optional[PostgresConfig]:
     )
 
 
-def _connect(cfg: PostgresConfig):
-    return psycopg2.connect(
-        host=cfg.host,
-        port=cfg.port,
-        dbname=cfg.dbname,
-        user=cfg.user,
-        password=cfg.password,
-        sslmode=cfg.sslmode,
-    )
+class _PooledConnection(psycopg2.extensions.connection):
+    """
+    Connection that remembers which server-side statements it has PREPAREd,
+    so each pooled connection plans the price queries only once.
+    """
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared: Set[str] = set()
 
-def fetch_price_history_from_postgres(
-    cfg: PostgresConfig,
-    card_name: str,
-    market: str = "cardmarket",
-    start_date: Optional[str] = None,
-    end_date: Optional[str] = None,
-    limit: int = 365,
-) -> List[Dict[str, Any]]:
-    """
-    IMPORTANT: You MUST adapt the SQL to your actual schema.
-    Using cardmarket_price_snapshot (your current schema).
 
-    Return:
-      [{"date": "YYYY-MM-DD", "price": 12.34, "currency": "EUR", "market": "cardmarket"}, ...]
-    """
-    if market != "cardmarket":
-        return []
+_POOL: Optional[ThreadedConnectionPool] = None
+_POOL_LOCK = threading.Lock()
 
-    use_date_filter = start_date is not None or end_date is not None
-    if use_date_filter and end_date is None:
-        end_date = dt.date.today().isoformat()
-    if use_date_filter and start_date is None:
-        start_date = (dt.date.today() - dt.timedelta(days=365)).isoformat()
 
-    if use_date_filter:
-        sql = """
+def _close_pool() -> None:
+    global _POOL
+    if _POOL is not None:
+        _POOL.closeall()
+        _POOL = None
+
+
+def _get_pool(cfg: PostgresConfig) -> ThreadedConnectionPool:
+    """
+    Lazily build one process-wide pool so the TCP + TLS handshake is paid once,
+    not on every tool invocation.
+    """
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = ThreadedConnectionPool(
+                    minconn=1,
+                    maxconn=int(os.getenv("DB_POOL_MAX", "8")),
+                    connection_factory=_PooledConnection,
+                    **asdict(cfg),
+                )
+                atexit.register(_close_pool)
+    return _POOL
+
+
+@contextmanager
+def pooled_connection(cfg: PostgresConfig) -> Iterator[_PooledConnection]:
+    """
+    Borrow a connection from the shared pool for one transaction.
+    Commits on success, rolls back on error, and always returns it to the pool.
+    """
+    pool = _get_pool(cfg)
+    conn = pool.getconn()
+    try:
+        with conn:
+            yield conn
+    finally:
+        pool.putconn(conn)
+
+
+# Server-side prepared statements; the raw card name is bound and the
+# wildcard pattern is built in SQL. `name ILIKE '%...%'` is served by the
+# idx_cardmarket_price_name_trgm GIN index (see price_extractor.ensure_tables).
+_PREPARED_SQL: Dict[str, str] = {
+    "price_range_q": """
+        (text, date, date, int) AS
         SELECT
           to_char(snapshot_date, 'YYYY-MM-DD') AS date,
-          COALESCE(trend_price, avg1, avg7, avg30) AS price,
+          COALESCE(trend_price, avg1, avg7, avg30)::float8 AS price,
           currency AS currency
         FROM cardmarket_price_snapshot
-        WHERE name ILIKE %(card_name)s
-          AND snapshot_date BETWEEN %(start_date)s::date AND %(end_date)s::date
-        ORDER BY snapshot_date ASC
-        LIMIT %(limit)s
-        """
-    else:
-        # No dates provided: return the most recent records (limited) in ascending order.
-        sql = """
+        WHERE name ILIKE ('%' || $1 || '%')
+          AND snapshot_date >= $2
+          AND snapshot_date <= $3
+        ORDER BY snapshot_date
+        LIMIT $4
+        """,
+    # No dates provided: return the most recent records (limited) in ascending order.
+    "price_recent_q": """
+        (text, int) AS
         SELECT
           date,
           price,
@@ -99,37 +136,118 @@ def fetch_price_history_from_postgres(
           SELECT
             snapshot_date,
             to_char(snapshot_date, 'YYYY-MM-DD') AS date,
-            COALESCE(trend_price, avg1, avg7, avg30) AS price,
+            COALESCE(trend_price, avg1, avg7, avg30)::float8 AS price,
             currency AS currency
           FROM cardmarket_price_snapshot
-          WHERE name ILIKE %(card_name)s
+          WHERE name ILIKE ('%' || $1 || '%')
           ORDER BY snapshot_date DESC
-          LIMIT %(limit)s
+          LIMIT $2
         ) AS recent
         ORDER BY snapshot_date ASC
-        """
+        """,
+}
+
+
+def _execute_prepared(conn: _PooledConnection, cur, name: str, params: tuple) -> None:
+    if name not in conn.prepared:
+        cur.execute(f"PREPARE {name} {_PREPARED_SQL[name]}")
+        conn.prepared.add(name)
+    placeholders = ", ".join(["%s"] * len(params))
+    cur.execute(f"EXECUTE {name}({placeholders})", params)
+
+
+_EPOCH_ORDINAL = dt.date(1970, 1, 1).toordinal()
+_TODAY_CACHE: Dict[str, Any] = {"day": None, "iso": "", "iso_m365": ""}
+
+
+def _refresh_today() -> Dict[str, Any]:
+    """
+    Recompute the default date-range bounds only when the (UTC) day changes.
+    """
+    day = int(time.time() // 86400)
+    if _TODAY_CACHE["day"] != day:
+        today = dt.date.fromordinal(_EPOCH_ORDINAL + day)
+        _TODAY_CACHE.update(
+            day=day,
+            iso=today.isoformat(),
+            iso_m365=(today - dt.timedelta(days=365)).isoformat(),
+        )
+    return _TODAY_CACHE
+
 
-    params = dict(
-        card_name=f"%{card_name}%",
+def _today_iso() -> str:
+    return _refresh_today()["iso"]
+
+
+def _today_minus_365_iso() -> str:
+    return _refresh_today()["iso_m365"]
+
+
+def fetch_price_columns_from_postgres(
+    cfg: PostgresConfig,
+    card_name: str,
+    market: str = "cardmarket",
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    limit: int = 365,
+) -> PriceColumns:
+    """
+    IMPORTANT: You MUST adapt the SQL to your actual schema.
+    Using cardmarket_price_snapshot (your current schema).
+
+    Return parallel columns (dates, prices, currencies), e.g.
+      (["2026-01-01", ...], [12.34, ...], ["EUR", ...])
+    """
+    if market != "cardmarket":
+        return [], [], []
+
+    use_date_filter = start_date is not None or end_date is not None
+    if use_date_filter and end_date is None:
+        end_date = _today_iso()
+    if use_date_filter and start_date is None:
+        start_date = _today_minus_365_iso()
+
+    if use_date_filter:
+        statement = "price_range_q"
+        params: tuple = (card_name, start_date, end_date, limit)
+    else:
+        statement = "price_recent_q"
+        params = (card_name, limit)
+
+    with pooled_connection(cfg) as conn:
+        with conn.cursor() as cur:
+            _execute_prepared(conn, cur, statement, params)
+            rows = cur.fetchmany(limit)
+
+    if not rows:
+        return [], [], []
+    dates, prices, currencies = zip(*rows)
+    return list(dates), list(prices), list(currencies)
+
+
+def fetch_price_history_from_postgres(
+    cfg: PostgresConfig,
+    card_name: str,
+    market: str = "cardmarket",
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    limit: int = 365,
+) -> List[Dict[str, Any]]:
+    """
+    Row-oriented view of `fetch_price_columns_from_postgres`.
+
+    Return:
+      [{"date": "YYYY-MM-DD", "price": 12.34, "currency": "EUR", "market": "cardmarket"}, ...]
+    """
+    dates, prices, currencies = fetch_price_columns_from_postgres(
+        cfg,
+        card_name=card_name,
         market=market,
         start_date=start_date,
         end_date=end_date,
         limit=limit,
     )
-
-    with _connect(cfg) as conn:
-        with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-            cur.execute(sql, params)
-            rows = cur.fetchall()
-
-    out = []
-    for r in rows:
-        out.append(
-            {
-                "date": r["date"],
-                "price": float(r["price"]) if r["price"] is not None else None,
-                "currency": r.get("currency"),
-                "market": "cardmarket",
-            }
-        )
-    return out
+    return [
+        {"date": d, "price": p, "currency": c, "market": "cardmarket"}
+        for d, p, c in zip(dates, prices, currencies)
+    ]
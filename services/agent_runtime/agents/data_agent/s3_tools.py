@@ -1,19 +1,33 @@
 from __future__ import annotations
 
 import os
+import functools
 from dataclasses import dataclass
 from typing import Optional, List, Dict, Any
 
 import boto3
+from botocore.exceptions import ClientError
+
+from agents.common.bedrock import boto_client_config
+from agents.common.json_utils import loads
+from agents.common.region import REGION
+
+# Only these columns are read from Parquet price files.
+_PARQUET_COLUMNS = ["date", "price", "currency"]
+# Bytes per read while streaming a JSONL object line by line.
+_STREAM_CHUNK_BYTES = int(os.getenv("S3_STREAM_CHUNK_BYTES", str(64 * 1024)))
 
 
 @dataclass(frozen=True)
 class S3PriceConfig:
     bucket: str
     prefix: str = ""
-    region: str = "us-east-1"
+    region: str = REGION
+    # "jsonl" (one object per card) or "parquet" (hive-partitioned dataset).
+    fmt: str = "jsonl"
 
 
+@functools.lru_cache(maxsize=1)
 def load_s3_price_config_from_env() -> Optional[S3PriceConfig]:
     bucket = os.getenv("S3_PRICE_BUCKET")
     if not bucket:
@@ -21,10 +35,34 @@ def load_s3_price_config_from_env() -> Optional[S3PriceConfig]:
     return S3PriceConfig(
         bucket=bucket,
         prefix=os.getenv("S3_PRICE_PREFIX", ""),
-        region=os.getenv("AWS_REGION", "us-east-1"),
+        region=REGION,
+        fmt=os.getenv("S3_PRICE_FORMAT", "jsonl").lower(),
     )
 
 
+@functools.lru_cache(maxsize=8)
+def _s3(region: str):
+    """One S3 client (and connection pool) per region for the process."""
+    return boto3.client("s3", region_name=region, config=boto_client_config(region))
+
+
+@functools.lru_cache(maxsize=8)
+def _s3_filesystem(region: str):
+    from pyarrow import fs
+
+    return fs.S3FileSystem(region=region)
+
+
+def _open_object(s3, bucket: str, key: str):
+    """Return the streaming body of an object, or None if the key doesn't exist."""
+    try:
+        return s3.get_object(Bucket=bucket, Key=key)["Body"]
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+
+
 def fetch_price_history_from_s3_jsonl(
     cfg: S3PriceConfig,
     card_name: str,
@@ -40,23 +78,74 @@ def fetch_price_history_from_s3_jsonl(
 
     Replace with your preferred format later (Parquet + Athena, Iceberg, etc).
     """
-    s3 = boto3.client("s3", region_name=cfg.region)
+    s3 = _s3(cfg.region)
     key = f"{cfg.prefix.rstrip('/')}/{market}/{card_name}.jsonl".lstrip("/")
 
-    try:
-        obj = s3.get_object(Bucket=cfg.bucket, Key=key)
-    except s3.exceptions.NoSuchKey:
+    body = _open_object(s3, cfg.bucket, key)
+    if body is None:
         return []
 
-    body = obj["Body"].read().decode("utf-8").splitlines()
+    # Stream lines and stop after `limit` of them: only the head of the
+    # object is transferred and parsed.
     out: List[Dict[str, Any]] = []
-    for line in body[:limit]:
-        line = line.strip()
-        if not line:
-            continue
-        import json
+    try:
+        for n, line in enumerate(body.iter_lines(chunk_size=_STREAM_CHUNK_BYTES)):
+            if n >= limit:
+                break
+            line = line.strip()
+            if not line:
+                continue
+            rec = loads(line)
+            rec["market"] = market
+            out.append(rec)
+    finally:
+        body.close()
+    return out
 
-        rec = json.loads(line)
+
+def fetch_price_history_from_s3_parquet(
+    cfg: S3PriceConfig,
+    card_name: str,
+    market: str = "cardmarket",
+    limit: int = 365,
+) -> List[Dict[str, Any]]:
+    """
+    Same contract as fetch_price_history_from_s3_jsonl, over a hive-partitioned
+    Parquet layout:
+        s3://{bucket}/{prefix}/{market}/card_name={card_name}/year={yyyy}/part-*.parquet
+
+    Opening the card's own partition directory means only its files are
+    listed, and only _PARQUET_COLUMNS are read from them.
+    """
+    import pyarrow.dataset as ds
+
+    root = f"{cfg.prefix.strip('/')}/{market}".lstrip("/")
+    try:
+        dataset = ds.dataset(
+            f"{cfg.bucket}/{root}/card_name={card_name}",
+            format="parquet",
+            partitioning="hive",
+            filesystem=_s3_filesystem(cfg.region),
+        )
+        table = dataset.to_table(columns=_PARQUET_COLUMNS)
+    except FileNotFoundError:
+        return []
+
+    out = table.sort_by("date").slice(0, limit).to_pylist()
+    for rec in out:
+        if hasattr(rec["date"], "isoformat"):
+            rec["date"] = rec["date"].isoformat()
         rec["market"] = market
-        out.append(rec)
     return out
+
+
+def fetch_price_history_from_s3(
+    cfg: S3PriceConfig,
+    card_name: str,
+    market: str = "cardmarket",
+    limit: int = 365,
+) -> List[Dict[str, Any]]:
+    """Dispatch on cfg.fmt (S3_PRICE_FORMAT)."""
+    if cfg.fmt == "parquet":
+        return fetch_price_history_from_s3_parquet(cfg, card_name, market=market, limit=limit)
+    return fetch_price_history_from_s3_jsonl(cfg, card_name, market=market, limit=limit)
@@ -1,21 +1,26 @@
 from __future__ import annotations
 
 import os
+import asyncio
 import logging
-from typing import Any, Dict, Optional
+import re
+import datetime as dt
+import functools
+import zlib
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Optional
 
 from bedrock_agentcore.runtime import BedrockAgentCoreApp
-from strands import Agent, tool
-from strands.models import BedrockModel
-from strands.telemetry import StrandsTelemetry
+from cachetools import TTLCache
 
-from agents.data_agent.db_tools import (
-    load_postgres_config_from_env,
-    fetch_price_history_from_postgres,
-)
+from agents.common.json_utils import dumps as _dumps
+from agents.common.region import REGION
 from observability.langfuse_client import load_langfuse_config_from_env, PromptProvider
 from observability.langfuse_tracing import trace_invocation, trace_step, update_trace, score_trace
 
+if TYPE_CHECKING:
+    from strands import Agent
+    from agents.orchestration_agent.semantic_cache import SemanticCache
+
 
 logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
 logger = logging.getLogger(__name__)
@@ -42,12 +47,34 @@ TOOL_NAMES = [
     "tell_pokemon_joke",
     "list_available_tools",
 ]
+_TOOLS_JSON = _dumps({"count": len(TOOL_NAMES), "tools": TOOL_NAMES})
+
+# Prompt mentions "tool" together with a listing phrase (in either order).
+_TOOLS_RE = re.compile(
+    r"^(?=.*tool)(?=.*(?:list|how many|what tools|available tools))",
+    re.IGNORECASE | re.DOTALL,
+)
+
+_JOKE_TEMPLATES = (
+    "Why did {name} bring a ladder to the Pokemon Center? It heard the care was on another level!",
+    "What do you call {name} when it tells a pun? A poke-groaner.",
+    "{name} tried to use Splash on a rainy day. It said, 'Finally, a move for this weather!'",
+    "Why did {name} refuse to battle? It didn’t want to get caught up in any drama.",
+)
 
 app = BedrockAgentCoreApp()
 
+# The orchestrator is one stateful Strands Agent whose message history is
+# shared, so its turns must not overlap; overlapping requests wait here.
+_ORCH_TURN_LOCK = asyncio.Lock()
+
 
-def _region() -> str:
-    return os.getenv("AWS_DEFAULT_REGION", os.getenv("AWS_REGION", "us-east-1"))
+# Sessions that have already had a turn. Only a session's first prompt is
+# context-free; follow-ups ("and last month?") depend on the conversation, so
+# they bypass the semantic cache.
+_SEEN_SESSIONS: TTLCache = TTLCache(
+    maxsize=10_000, ttl=int(os.getenv("ORCH_SESSION_TTL", "3600"))
+)
 
 
 def _init_telemetry() -> None:
@@ -55,22 +82,27 @@ def _init_telemetry() -> None:
     This sets up OTEL exporters inside the container.
     In AgentCore Runtime, you typically pass OTEL_* env vars at launch.
     """
+    from strands.telemetry import StrandsTelemetry
+
     telemetry = StrandsTelemetry()
     telemetry.setup_otlp_exporter()
 
 
 def _build_orchestrator(region: str) -> Agent:
-    model_id = os.getenv(
-        "BEDROCK_MODEL_ID",
-        "global.anthropic.claude-haiku-4-5-20251001-v1:0",
-    )
-    model = BedrockModel(
-        model_id=model_id,
-        region_name=region,
-        temperature=0.2,
-        streaming=False,
+    # strands (and psycopg2 via db_tools) are imported here rather than at
+    # module scope so cold starts and the tool-list fast path don't pay for them.
+    from strands import Agent, tool
+
+    from agents.common.bedrock import bedrock_model
+    from agents.common.num import iso_dates_ending, ramp
+    from agents.common.json_utils import dump_price_payload
+    from agents.data_agent.db_tools import (
+        load_postgres_config_from_env,
+        fetch_price_columns_from_postgres,
     )
 
+    model = bedrock_model(region, temperature=0.2, streaming=True)
+
     lf_cfg = load_langfuse_config_from_env()
     if lf_cfg:
         provider = PromptProvider(lf_cfg)
@@ -95,11 +127,9 @@ def _build_orchestrator(region: str) -> Agent:
 
         Returns: a JSON string.
         """
-        import json
-
         pg_cfg = load_postgres_config_from_env()
         if not pg_cfg:
-            return json.dumps(
+            return _dumps(
                 {
                     "card_name": card_name,
                     "market": market,
@@ -110,7 +140,7 @@ def _build_orchestrator(region: str) -> Agent:
             )
 
         try:
-            prices = fetch_price_history_from_postgres(
+            dates, prices, currencies = fetch_price_columns_from_postgres(
                 pg_cfg,
                 card_name=card_name,
                 market=market,
@@ -119,7 +149,7 @@ def _build_orchestrator(region: str) -> Agent:
                 limit=limit,
             )
         except Exception as exc:
-            return json.dumps(
+            return _dumps(
                 {
                     "card_name": card_name,
                     "market": market,
@@ -129,14 +159,7 @@ def _build_orchestrator(region: str) -> Agent:
                 }
             )
 
-        return json.dumps(
-            {
-                "card_name": card_name,
-                "market": market,
-                "prices": prices,
-                "source": "postgres",
-            }
-        )
+        return dump_price_payload(card_name, market, "postgres", dates, prices, currencies)
 
     @tool
     def fetch_fake_price_history(
@@ -147,23 +170,13 @@ def _build_orchestrator(region: str) -> Agent:
         """
         Return a deterministic, fake price series for diagnostics.
         """
-        import datetime as dt
-        import json
-
-        end_date = dt.date.today()
         days = max(1, min(days, 30))
-        prices = []
-        for i in range(days):
-            date = (end_date - dt.timedelta(days=days - 1 - i)).isoformat()
-            prices.append(
-                {
-                    "date": date,
-                    "price": float(10.0 + i),
-                    "currency": "EUR",
-                    "market": market,
-                }
-            )
-        return json.dumps(
+        dates = iso_dates_ending(dt.date.today(), days)
+        prices = [
+            {"date": d, "price": p, "currency": "EUR", "market": market}
+            for d, p in zip(dates, ramp(days).tolist())
+        ]
+        return _dumps(
             {
                 "card_name": card_name,
                 "market": market,
@@ -177,26 +190,17 @@ def _build_orchestrator(region: str) -> Agent:
         """
         Return a lighthearted joke about the given Pokemon.
         """
-        import json
-
         name = pokemon_name.strip() or "that Pokemon"
-        jokes = [
-            f"Why did {name} bring a ladder to the Pokemon Center? It heard the care was on another level!",
-            f"What do you call {name} when it tells a pun? A poke-groaner.",
-            f"{name} tried to use Splash on a rainy day. It said, 'Finally, a move for this weather!'",
-            f"Why did {name} refuse to battle? It didn’t want to get caught up in any drama.",
-        ]
-        joke = jokes[hash(name) % len(jokes)]
-        return json.dumps({"pokemon": name, "joke": joke})
+        # crc32 is stable across processes, unlike the PYTHONHASHSEED-salted hash().
+        joke = _JOKE_TEMPLATES[zlib.crc32(name.encode("utf-8")) & 3].format(name=name)
+        return _dumps({"pokemon": name, "joke": joke})
 
     @tool
     def list_available_tools() -> str:
         """
         Return a list of tool names exposed to the agent.
         """
-        import json
-
-        return json.dumps({"count": len(TOOL_NAMES), "tools": TOOL_NAMES})
+        return _TOOLS_JSON
 
     agent = Agent(
         model=model,
@@ -211,32 +215,36 @@ def _build_orchestrator(region: str) -> Agent:
     return agent
 
 
-_init_telemetry()
-_ORCH_AGENT = _build_orchestrator(region=_region())
+@functools.lru_cache(maxsize=1)
+def _orch() -> Agent:
+    _init_telemetry()
+    return _build_orchestrator(region=REGION)
 
 
-@app.entrypoint
-def pokemon_trader_chat(payload: Dict[str, Any], context=None) -> Dict[str, Any]:
-    """
-    AgentCore Runtime entrypoint.
-    Expected payload: {"prompt": "..."}
-    """
-    prompt = payload.get("prompt") or payload.get("message") or ""
-    if not isinstance(prompt, str) or not prompt.strip():
-        return {"error": "Missing 'prompt' in payload."}
+@functools.lru_cache(maxsize=1)
+def _semantic_cache() -> Optional[SemanticCache]:
+    from agents.data_agent.db_tools import load_postgres_config_from_env
+    from agents.orchestration_agent.semantic_cache import build_semantic_cache
 
-    prompt_lc = prompt.lower()
-    if "tool" in prompt_lc and (
-        "list" in prompt_lc
-        or "how many" in prompt_lc
-        or "what tools" in prompt_lc
-        or "available tools" in prompt_lc
-    ):
-        import json
+    return build_semantic_cache(load_postgres_config_from_env(), region=REGION)
 
-        return {"response": json.dumps({"count": len(TOOL_NAMES), "tools": TOOL_NAMES})}
+
+async def _chat_chunks(
+    prompt: str, payload: Dict[str, Any], context, stream: bool
+) -> AsyncIterator[str]:
+    """
+    Run one traced orchestrator turn and yield the reply text.
+    With stream=True chunks are yielded as Bedrock produces them; otherwise
+    the full reply is yielded once.
+    """
+    orch_agent = _orch()
+    semantic_cache = _semantic_cache()
 
     session_id = getattr(context, "session_id", None)
+    if session_id is None or session_id in _SEEN_SESSIONS:
+        semantic_cache = None
+    if session_id is not None:
+        _SEEN_SESSIONS[session_id] = True
     user_id = payload.get("user_id")
     trace_id = getattr(context, "trace_id", None)
 
@@ -251,18 +259,39 @@ def pokemon_trader_chat(payload: Dict[str, Any], context=None) -> Dict[str, Any]
         input={"prompt": prompt},
         metadata={"agentcore_trace_id": trace_id} if trace_id else None,
     ):
-        with trace_step(
-            name="agent_reasoning",
-            as_type="chain",
-            input={"prompt": prompt},
-            metadata={"tool_count": len(TOOL_NAMES)},
-        ):
-            response = _ORCH_AGENT(prompt)
-
-        try:
-            text = response.message["content"][0]["text"]
-        except Exception:
-            text = str(response)
+        text = None
+        cache_vec = None
+        if semantic_cache is not None:
+            text, cache_vec = await asyncio.to_thread(semantic_cache.lookup, prompt)
+
+        if text is not None:
+            yield text
+        else:
+            with trace_step(
+                name="agent_reasoning",
+                as_type="chain",
+                input={"prompt": prompt},
+                metadata={"tool_count": len(TOOL_NAMES)},
+            ):
+                async with _ORCH_TURN_LOCK:
+                    if stream:
+                        parts = []
+                        async for event in orch_agent.stream_async(prompt):
+                            chunk = event.get("data")
+                            if chunk:
+                                parts.append(chunk)
+                                yield chunk
+                        text = "".join(parts)
+                    else:
+                        response = await orch_agent.invoke_async(prompt)
+                        try:
+                            text = response.message["content"][0]["text"]
+                        except Exception:
+                            text = str(response)
+                        yield text
+
+            if semantic_cache is not None and cache_vec is not None:
+                await asyncio.to_thread(semantic_cache.store, cache_vec, text)
 
         update_trace(
             name=str(agent_name),
@@ -292,6 +321,39 @@ def pokemon_trader_chat(payload: Dict[str, Any], context=None) -> Dict[str, Any]
                 comment=payload.get("score_comment"),
             )
 
+
+async def _stream_events(
+    prompt: str, payload: Dict[str, Any], context
+) -> AsyncIterator[Dict[str, Any]]:
+    if _TOOLS_RE.search(prompt):
+        yield {"response_chunk": _TOOLS_JSON}
+        return
+    async for chunk in _chat_chunks(prompt, payload, context, stream=True):
+        yield {"response_chunk": chunk}
+
+
+@app.entrypoint
+async def pokemon_trader_chat(payload: Dict[str, Any], context=None):
+    """
+    AgentCore Runtime entrypoint.
+    Expected payload: {"prompt": "...", "stream": false}
+
+    Async so overlapping invocations don't each hold a worker thread while
+    waiting on Bedrock; blocking DB work runs in a thread.
+    With "stream": true the reply is returned as an async generator of
+    {"response_chunk": "..."} events, which AgentCore serves as SSE.
+    """
+    prompt = payload.get("prompt") or payload.get("message") or ""
+    if not isinstance(prompt, str) or not prompt.strip():
+        return {"error": "Missing 'prompt' in payload."}
+
+    if payload.get("stream"):
+        return _stream_events(prompt, payload, context)
+
+    if _TOOLS_RE.search(prompt):
+        return {"response": _TOOLS_JSON}
+
+    text = "".join([c async for c in _chat_chunks(prompt, payload, context, stream=False)])
     return {"response": text}
 
 
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import os
+import json
+import logging
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import boto3
+
+from agents.common.bedrock import boto_client_config
+from agents.data_agent.db_tools import PostgresConfig, pooled_connection
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA_SQL = """
+CREATE EXTENSION IF NOT EXISTS vector;
+CREATE TABLE IF NOT EXISTS orch_cache (
+  id   BIGSERIAL PRIMARY KEY,
+  emb  vector(1024) NOT NULL,
+  resp TEXT        NOT NULL,
+  ts   TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS idx_orch_cache_emb_hnsw
+  ON orch_cache USING hnsw (emb vector_cosine_ops);
+CREATE INDEX IF NOT EXISTS idx_orch_cache_ts ON orch_cache (ts);
+"""
+
+# Expired rows are deleted on store, at most once per this many seconds.
+_PRUNE_INTERVAL = 300.0
+
+
+def _to_vector_literal(embedding: List[float]) -> str:
+    return "[" + ",".join(repr(float(x)) for x in embedding) + "]"
+
+
+class SemanticCache:
+    """
+    Orchestrator response cache keyed by prompt embedding:
+    - Embed the prompt with Bedrock Titan
+    - Return the nearest cached response younger than ttl_seconds if cosine
+      similarity >= threshold
+    - Store (embedding, response) on miss; expired rows are pruned
+
+    Every failure degrades to a cache miss; the cache must never break chat.
+    If the schema can't be created the cache disables itself.
+    """
+
+    def __init__(
+        self,
+        pg_cfg: PostgresConfig,
+        region: str,
+        embed_model_id: str = "amazon.titan-embed-text-v2:0",
+        threshold: float = 0.95,
+        ttl_seconds: int = 900,
+    ):
+        self._pg_cfg = pg_cfg
+        self._embed_model_id = embed_model_id
+        self._threshold = threshold
+        self._ttl_seconds = ttl_seconds
+        self._next_prune = 0.0
+        self._bedrock = boto3.client(
+            "bedrock-runtime", region_name=region, config=boto_client_config(region)
+        )
+        self._schema_ready = False
+        self._disabled = False
+        self._schema_lock = threading.Lock()
+
+    def _ensure_schema(self) -> bool:
+        """Create the table once; on failure disable the cache instead of retrying."""
+        if self._schema_ready or self._disabled:
+            return self._schema_ready
+        with self._schema_lock:
+            if self._schema_ready or self._disabled:
+                return self._schema_ready
+            try:
+                with pooled_connection(self._pg_cfg) as conn:
+                    with conn.cursor() as cur:
+                        cur.execute(_SCHEMA_SQL)
+            except Exception as exc:
+                logger.warning("Semantic cache disabled, schema setup failed: %s", exc)
+                self._disabled = True
+                return False
+            self._schema_ready = True
+            return True
+
+    def _embed(self, text: str) -> List[float]:
+        resp = self._bedrock.invoke_model(
+            modelId=self._embed_model_id,
+            body=json.dumps({"inputText": text, "dimensions": 1024, "normalize": True}),
+            contentType="application/json",
+            accept="application/json",
+        )
+        return json.loads(resp["body"].read())["embedding"]
+
+    def lookup(self, prompt: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Return (cached_response, vector_literal). The vector literal is passed
+        back to `store` on a miss so the prompt is only embedded once.
+        """
+        if not self._ensure_schema():
+            return None, None
+        try:
+            vec = _to_vector_literal(self._embed(prompt))
+            with pooled_connection(self._pg_cfg) as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        """
+                        SELECT resp, 1 - (emb <=> %(vec)s::vector) AS similarity
+                        FROM orch_cache
+                        WHERE ts > now() - make_interval(secs => %(ttl)s)
+                        ORDER BY emb <=> %(vec)s::vector
+                        LIMIT 1
+                        """,
+                        {"vec": vec, "ttl": self._ttl_seconds},
+                    )
+                    row = cur.fetchone()
+        except Exception as exc:
+            logger.warning("Semantic cache lookup failed: %s", exc)
+            return None, None
+
+        if row and row[1] is not None and float(row[1]) >= self._threshold:
+            return row[0], vec
+        return None, vec
+
+    def store(self, vec: str, response: str) -> None:
+        if not self._ensure_schema():
+            return
+        now = time.monotonic()
+        prune = now >= self._next_prune
+        if prune:
+            self._next_prune = now + _PRUNE_INTERVAL
+        try:
+            with pooled_connection(self._pg_cfg) as conn:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "INSERT INTO orch_cache (emb, resp) VALUES (%s::vector, %s)",
+                        (vec, response),
+                    )
+                    if prune:
+                        cur.execute(
+                            "DELETE FROM orch_cache WHERE ts <= now() - make_interval(secs => %s)",
+                            (self._ttl_seconds,),
+                        )
+        except Exception as exc:
+            logger.warning("Semantic cache store failed: %s", exc)
+
+
+def build_semantic_cache(
+    pg_cfg: Optional[PostgresConfig], region: str
+) -> Optional[SemanticCache]:
+    """
+    Return None unless ORCH_SEMANTIC_CACHE is enabled and Postgres is configured.
+    """
+    if not pg_cfg:
+        return None
+    if os.getenv("ORCH_SEMANTIC_CACHE", "").lower() not in ("1", "true", "yes"):
+        return None
+    return SemanticCache(
+        pg_cfg,
+        region=region,
+        embed_model_id=os.getenv("ORCH_CACHE_EMBED_MODEL_ID", "amazon.titan-embed-text-v2:0"),
+        threshold=float(os.getenv("ORCH_CACHE_THRESHOLD", "0.95")),
+        ttl_seconds=int(os.getenv("ORCH_CACHE_TTL", "900")),
+    )
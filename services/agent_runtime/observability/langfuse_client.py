@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import os
-import time
+import functools
+import threading
 from dataclasses import dataclass
-from typing import Optional, Dict, Any
+from typing import Optional, Dict
+
+from cachetools import TTLCache
 
 try:
     from langfuse import Langfuse
@@ -49,7 +52,13 @@ class PromptProvider:
                 secret_key=cfg.secret_key,
                 base_url=cfg.base_url,
             )
-        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._cache: TTLCache = TTLCache(maxsize=32, ttl=cfg.prompt_cache_ttl_seconds)
+        self._lock = threading.Lock()
+        # One fetch lock per key: concurrent misses wait for a single
+        # upstream get_prompt instead of all calling Langfuse.
+        self._inflight: Dict[str, threading.Lock] = {}
+        # Name of the prompt-text attribute on this SDK's prompt objects.
+        self._text_attr: Optional[str] = None
 
     def _cache_key(self, name: str, label: str) -> str:
         return f"{name}:{label}"
@@ -58,29 +67,42 @@ class PromptProvider:
         label = label or self._cfg.prompt_label
         key = self._cache_key(name, label)
 
-        now = time.time()
-        cached = self._cache.get(key)
-        if cached and (now - cached["ts"]) < self._cfg.prompt_cache_ttl_seconds:
-            return str(cached["value"])
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                return cached
+            fetch_lock = self._inflight.setdefault(key, threading.Lock())
+
+        with fetch_lock:
+            with self._lock:
+                cached = self._cache.get(key)
+            if cached is not None:
+                return cached
+            try:
+                text = str(self._fetch_prompt_text(name, label))
+                with self._lock:
+                    self._cache[key] = text
+            finally:
+                with self._lock:
+                    self._inflight.pop(key, None)
+        return text
 
-        prompt_obj = None
+    def _fetch_prompt_text(self, name: str, label: str):
         try:
             prompt_obj = self._client.get_prompt(name=name, label=label)
-            if hasattr(prompt_obj, "prompt"):
-                text = prompt_obj.prompt
-            elif hasattr(prompt_obj, "text"):
-                text = prompt_obj.text
-            elif hasattr(prompt_obj, "content"):
-                text = prompt_obj.content
-            else:
-                text = str(prompt_obj)
         except Exception as exc:
             raise RuntimeError(f"Failed to fetch prompt from Langfuse: {exc}") from exc
-
-        self._cache[key] = {"value": text, "ts": now}
-        return str(text)
+        attr = self._text_attr
+        if attr is None:
+            # The SDK version is fixed for the process: probe once, then reuse.
+            attr = next(
+                (a for a in ("prompt", "text", "content") if hasattr(prompt_obj, a)), ""
+            )
+            self._text_attr = attr
+        return getattr(prompt_obj, attr) if attr else str(prompt_obj)
 
 
+@functools.lru_cache(maxsize=1)
 def load_langfuse_config_from_env() -> Optional[LangfuseConfig]:
     """
     Return None if keys are not set (so you can run without Langfuse in dev).
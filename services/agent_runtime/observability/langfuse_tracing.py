@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from contextlib import contextmanager
+from contextlib import ExitStack, contextmanager
 from typing import Any, Dict, Iterator, Optional
 
 try:
@@ -10,13 +10,20 @@ except Exception:  # pragma: no cover
     propagate_attributes = None  # type: ignore
 
 
+# get_client() returns the process-wide Langfuse singleton; look it up once
+# rather than on every traced step. Failed lookups are retried next call.
+_LF_CLIENT = None
+
+
 def _client():
-    if get_client is None:
-        return None
+    global _LF_CLIENT
+    if _LF_CLIENT is not None or get_client is None:
+        return _LF_CLIENT
     try:
-        return get_client()
+        _LF_CLIENT = get_client()
     except Exception:
         return None
+    return _LF_CLIENT
 
 
 @contextmanager
@@ -37,6 +44,7 @@ def trace_invocation(
         yield
         return
 
+    # Nothing to propagate for anonymous, metadata-free calls.
     attrs_ctx = (
         propagate_attributes(
             user_id=user_id,
@@ -44,23 +52,22 @@ def trace_invocation(
             metadata=metadata,
         )
         if propagate_attributes is not None
+        and (user_id is not None or session_id is not None or metadata is not None)
         else None
     )
-    try:
+    with ExitStack() as stack:
         if attrs_ctx is not None:
-            attrs_ctx.__enter__()
-    trace_context = {"trace_id": client.create_trace_id()}
-    with client.start_as_current_observation(
-        trace_context=trace_context,
-        name=name,
-        as_type="agent",
-        input=input,
-        metadata=metadata,
-    ):
+            stack.enter_context(attrs_ctx)
+        stack.enter_context(
+            client.start_as_current_observation(
+                trace_context={"trace_id": client.create_trace_id()},
+                name=name,
+                as_type="agent",
+                input=input,
+                metadata=metadata,
+            )
+        )
         yield
-    finally:
-        if attrs_ctx is not None:
-            attrs_ctx.__exit__(None, None, None)
 
 
 @contextmanager
@@ -1,25 +1,58 @@
-import json
+import functools
 import os
+import time
 import uuid
-from datetime import date
-from typing import Optional, Dict, Any, List
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List, Tuple
 
+import anyio
 import boto3
+import orjson
+from botocore.config import Config
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse, Response
 from pydantic import BaseModel
-from psycopg2.pool import SimpleConnectionPool
+from psycopg2.pool import ThreadedConnectionPool
 import psycopg2
 
+try:
+    import redis
+except ImportError:  # optional: valuation responses are just not cached
+    redis = None
+
 DB_HOST = os.getenv("DB_HOST")
 DB_PORT = int(os.getenv("DB_PORT", "5432"))
 DB_NAME = os.getenv("DB_NAME", "poke")
 DB_USER = os.getenv("DB_USER")
 DB_PASSWORD = os.getenv("DB_PASSWORD")
+DB_IAM_AUTH = os.getenv("DB_IAM_AUTH") == "1"
 
-app = FastAPI(title="Poke Platform API")
-_pool: Optional[SimpleConnectionPool] = None
+app = FastAPI(title="Poke Platform API", default_response_class=ORJSONResponse)
+# Sync handlers share one pool across the threadpool's workers, so it must
+# be thread-safe and large enough not to be the bottleneck.
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "4"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "20"))
+_pool: Optional[ThreadedConnectionPool] = None
+# /api/chat waits seconds to minutes on AgentCore. It runs its blocking calls on
+# its own capacity limiter so long chats can't use up the shared threadpool
+# that the sync DB handlers run on.
+CHAT_MAX_CONCURRENCY = int(os.getenv("CHAT_MAX_CONCURRENCY", "64"))
+_chat_limiter = anyio.CapacityLimiter(CHAT_MAX_CONCURRENCY)
 _agentcore_client = boto3.client(
-    "bedrock-agentcore", region_name=os.getenv("AWS_REGION", "us-east-1")
+    "bedrock-agentcore",
+    region_name=os.getenv("POKE_REGION") or os.getenv("AWS_REGION", "us-east-2"),
+    config=Config(max_pool_connections=CHAT_MAX_CONCURRENCY),
+)
+# Valuations only change when the strategy runner writes a new day, so the
+# serialized responses are cached in Redis until midnight UTC. The runner
+# deletes VALUATIONS_CACHE_PREFIX keys after each run.
+REDIS_URL = os.getenv("REDIS_URL")
+VALUATIONS_CACHE_PREFIX = "val:"
+_redis = (
+    redis.Redis.from_url(REDIS_URL, socket_timeout=0.25, socket_connect_timeout=0.25)
+    if redis is not None and REDIS_URL
+    else None
 )
 
 
@@ -37,32 +70,56 @@ class ChatResponse(BaseModel):
     raw: Optional[Dict[str, Any]] = None
 
 def db_enabled() -> bool:
-    return all([DB_HOST, DB_USER, DB_PASSWORD])
+    return all([DB_HOST, DB_USER, DB_PASSWORD or DB_IAM_AUTH])
+
+def db_password():
+    # Via the RDS Proxy (DB_IAM_AUTH=1) the password is a 15-minute IAM token.
+    if not DB_IAM_AUTH:
+        return DB_PASSWORD
+    import boto3
+
+    return boto3.client("rds").generate_db_auth_token(DB_HOST, DB_PORT, DB_USER)
+
+class _Pool(ThreadedConnectionPool):
+    """Re-sign the IAM token for every new backend connection (tokens last 15 min)."""
 
-def get_pool() -> SimpleConnectionPool:
+    def _connect(self, key=None):
+        self._kwargs["password"] = db_password()
+        return super()._connect(key)
+
+def get_pool() -> ThreadedConnectionPool:
     global _pool
     if _pool is None:
         if not db_enabled():
             raise RuntimeError("DB not configured")
-        _pool = SimpleConnectionPool(
-            minconn=1,
-            maxconn=5,
+        _pool = _Pool(
+            minconn=DB_POOL_MIN,
+            maxconn=DB_POOL_MAX,
             host=DB_HOST,
             port=DB_PORT,
             dbname=DB_NAME,
             user=DB_USER,
-            password=DB_PASSWORD,
             connect_timeout=5,
         )
     return _pool
 
-def init_db() -> None:
+@contextmanager
+def acquire():
+    """Borrow a pooled connection, returning it even if the handler raises.
+
+    putconn rolls back open transactions and discards connections in an
+    unknown state; ones that are already closed are dropped here.
+    """
     pool = get_pool()
     conn = pool.getconn()
     try:
-        conn.commit()
+        yield conn
     finally:
-        pool.putconn(conn)
+        pool.putconn(conn, close=bool(conn.closed))
+
+def init_db() -> None:
+    with acquire() as conn:
+        conn.commit()
 
 @app.on_event("startup")
 def startup():
@@ -75,101 +132,174 @@ def health():
 
 
 def _read_streaming_body(body) -> str:
-    chunks: List[bytes] = []
+    # Grow one buffer in place instead of keeping every chunk alive for a join.
+    buf = bytearray()
     for chunk in body.iter_chunks():
-        if chunk:
-            chunks.append(chunk)
-    return b"".join(chunks).decode("utf-8", errors="replace")
+        buf += chunk
+    return buf.decode("utf-8", errors="replace")
 
-def _fetch_valuations(order: str, limit: int, strategy_name: Optional[str], strategy_version: Optional[str]):
-    pool = get_pool()
-    conn = pool.getconn()
-    try:
+
+VALUATIONS_MAX_LIMIT = 200
+
+_VALUATIONS_SQL_BASE = """
+    WITH latest_card AS (
+        SELECT DISTINCT ON (asset_id)
+            asset_id,
+            name,
+            artist,
+            rarity,
+            set_name
+        FROM card_metadata
+        ORDER BY asset_id, snapshot_date DESC, updated_ts DESC
+    )
+    -- NUMERIC columns are cast server-side so psycopg2 returns float, not Decimal.
+    SELECT vd.val_date,
+           vd.asset_id,
+           vd.market_price::float8,
+           vd.forecast_price::float8,
+           vd.gap::float8,
+           vd.gap_pct::float8,
+           vd.confidence::float8,
+           vd.rationale_json,
+           cm.name,
+           cm.artist,
+           cm.rarity,
+           cm.set_name
+    FROM valuation_daily vd
+    LEFT JOIN latest_card cm ON cm.asset_id = vd.asset_id
+    WHERE vd.val_date = %s
+"""
+
+
+def _valuations_sql(order: str, has_name: bool, has_version: bool) -> str:
+    filters = ""
+    if has_name:
+        filters += " AND vd.strategy_name = %s"
+    if has_version:
+        filters += " AND vd.strategy_version = %s"
+    return f"{_VALUATIONS_SQL_BASE}{filters} ORDER BY vd.gap_pct {order} LIMIT %s;"
+
+
+# One fixed statement text per (order, filters) combination, so every request
+# sends identical SQL rather than assembling it per call.
+_VALUATIONS_SQL = {
+    (order, has_name, has_version): _valuations_sql(order, has_name, has_version)
+    for order in ("ASC", "DESC")
+    for has_name in (False, True)
+    for has_version in (False, True)
+}
+
+
+def _clamp_limit(limit: int) -> int:
+    return max(1, min(limit, VALUATIONS_MAX_LIMIT))
+
+
+# MAX(val_date) only moves when the strategy runner writes a new day, so it is
+# re-read at most every VAL_DATE_TTL_SECONDS and bound into the query.
+VAL_DATE_TTL_SECONDS = int(os.getenv("VAL_DATE_TTL_SECONDS", "300"))
+_latest_val_date: Optional[Tuple[Optional[date], float]] = None
+
+
+def latest_val_date() -> Optional[date]:
+    global _latest_val_date
+    cached = _latest_val_date
+    if cached is not None and time.monotonic() - cached[1] < VAL_DATE_TTL_SECONDS:
+        return cached[0]
+    with acquire() as conn:
         with conn.cursor() as cur:
-            base = """
-                WITH latest_val AS (
-                    SELECT MAX(val_date) AS val_date FROM valuation_daily
-                ),
-                latest_card AS (
-                    SELECT DISTINCT ON (asset_id)
-                        asset_id,
-                        name,
-                        artist,
-                        rarity,
-                        set_name
-                    FROM card_metadata
-                    ORDER BY asset_id, snapshot_date DESC, updated_ts DESC
-                )
-                SELECT vd.val_date,
-                       vd.asset_id,
-                       vd.market_price,
-                       vd.forecast_price,
-                       vd.gap,
-                       vd.gap_pct,
-                       vd.confidence,
-                       vd.rationale_json,
-                       cm.name,
-                       cm.artist,
-                       cm.rarity,
-                       cm.set_name
-                FROM valuation_daily vd
-                JOIN latest_val l ON vd.val_date = l.val_date
-                LEFT JOIN latest_card cm ON cm.asset_id = vd.asset_id
-            """
-            params: List[Any] = []
-            clauses = []
-            if strategy_name:
-                clauses.append("vd.strategy_name = %s")
-                params.append(strategy_name)
-            if strategy_version:
-                clauses.append("vd.strategy_version = %s")
-                params.append(strategy_version)
-            if clauses:
-                base += " WHERE " + " AND ".join(clauses)
-            base += f" ORDER BY vd.gap_pct {order} LIMIT %s;"
-            params.append(limit)
-            cur.execute(base, params)
+            cur.execute("SELECT MAX(val_date) FROM valuation_daily;")
+            val_date = cur.fetchone()[0]
+    _latest_val_date = (val_date, time.monotonic())
+    return val_date
+
+
+def _fetch_valuations(
+    order: str,
+    limit: int,
+    strategy_name: Optional[str],
+    strategy_version: Optional[str],
+    val_date: date,
+):
+    sql = _VALUATIONS_SQL[(order, bool(strategy_name), bool(strategy_version))]
+    params: List[Any] = [val_date]
+    params.extend(p for p in (strategy_name, strategy_version) if p)
+    params.append(_clamp_limit(limit))
+    with acquire() as conn:
+        with conn.cursor() as cur:
+            cur.execute(sql, params)
             rows = cur.fetchall()
 
-        valuations = []
-        for r in rows:
-            valuations.append(
-                {
-                    "val_date": str(r[0]),
-                    "asset_id": r[1],
-                    "market_price": float(r[2]),
-                    "forecast_price": float(r[3]),
-                    "gap": float(r[4]),
-                    "gap_pct": float(r[5]),
-                    "confidence": float(r[6]),
-                    "rationale": r[7],
-                    "name": r[8],
-                    "artist": r[9],
-                    "rarity": r[10],
-                    "set_name": r[11],
-                }
-            )
-        return {"valuations": valuations}
-    finally:
-        pool.putconn(conn)
+    valuations = []
+    for r in rows:
+        valuations.append(
+            {
+                "val_date": str(r[0]),
+                "asset_id": r[1],
+                "market_price": r[2],
+                "forecast_price": r[3],
+                "gap": r[4],
+                "gap_pct": r[5],
+                "confidence": r[6],
+                "rationale": r[7],
+                "name": r[8],
+                "artist": r[9],
+                "rarity": r[10],
+                "set_name": r[11],
+            }
+        )
+    return {"valuations": valuations}
+
+
+def _seconds_until_midnight_utc() -> int:
+    now = datetime.now(timezone.utc)
+    midnight = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return max(1, int((midnight - now).total_seconds()))
+
+
+def _cached_valuations(order: str, limit: int, strategy_name: Optional[str], strategy_version: Optional[str]) -> Response:
+    """Serve _fetch_valuations from Redis when possible; cache errors fall through to the DB."""
+    limit = _clamp_limit(limit)
+    val_date = latest_val_date()
+    if val_date is None:
+        return Response(content=orjson.dumps({"valuations": []}), media_type="application/json")
+    # The date is part of the key so a new day never serves the previous one's entries.
+    key = (
+        f"{VALUATIONS_CACHE_PREFIX}{val_date}:{order}:{limit}:"
+        f"{strategy_name or '*'}:{strategy_version or '*'}"
+    )
+    if _redis is not None:
+        try:
+            cached = _redis.get(key)
+        except redis.RedisError:
+            cached = None
+        if cached:
+            return Response(content=cached, media_type="application/json")
+
+    body = orjson.dumps(_fetch_valuations(order, limit, strategy_name, strategy_version, val_date))
+    if _redis is not None:
+        try:
+            _redis.set(key, body, ex=_seconds_until_midnight_utc())
+        except redis.RedisError:
+            pass
+    return Response(content=body, media_type="application/json")
 
 
 @app.get("/api/valuations/undervalued")
 def valuations_undervalued(limit: int = 10, strategy_name: Optional[str] = None, strategy_version: Optional[str] = None):
     if not db_enabled():
         return {"valuations": [], "note": "DB not configured"}
-    return _fetch_valuations("DESC", limit, strategy_name, strategy_version)
+    return _cached_valuations("DESC", limit, strategy_name, strategy_version)
 
 
 @app.get("/api/valuations/overvalued")
 def valuations_overvalued(limit: int = 10, strategy_name: Optional[str] = None, strategy_version: Optional[str] = None):
     if not db_enabled():
         return {"valuations": [], "note": "DB not configured"}
-    return _fetch_valuations("ASC", limit, strategy_name, strategy_version)
+    return _cached_valuations("ASC", limit, strategy_name, strategy_version)
 
 
 @app.post("/api/chat", response_model=ChatResponse)
-def chat(req: ChatRequest):
+async def chat(req: ChatRequest):
     agent_runtime_arn = os.getenv("AGENTCORE_AGENT_RUNTIME_ARN")
     if not agent_runtime_arn:
         raise HTTPException(
@@ -183,14 +313,18 @@ def chat(req: ChatRequest):
     payload = {"prompt": req.message}
 
     try:
-        resp = _agentcore_client.invoke_agent_runtime(
-            agentRuntimeArn=agent_runtime_arn,
-            runtimeSessionId=session_id,
-            traceId=trace_id,
-            contentType="application/json",
-            accept="application/json",
-            payload=bytes(json.dumps(payload), "utf-8"),
-            qualifier=os.getenv("AGENTCORE_QUALIFIER", "DEFAULT"),
+        resp = await anyio.to_thread.run_sync(
+            functools.partial(
+                _agentcore_client.invoke_agent_runtime,
+                agentRuntimeArn=agent_runtime_arn,
+                runtimeSessionId=session_id,
+                traceId=trace_id,
+                contentType="application/json",
+                accept="application/json",
+                payload=orjson.dumps(payload),
+                qualifier=os.getenv("AGENTCORE_QUALIFIER", "DEFAULT"),
+            ),
+            limiter=_chat_limiter,
         )
     except Exception as exc:
         raise HTTPException(status_code=500, detail=str(exc))
@@ -199,12 +333,12 @@ def chat(req: ChatRequest):
     if stream is None:
         raise HTTPException(status_code=500, detail="No response body returned")
 
-    text = _read_streaming_body(stream)
+    text = await anyio.to_thread.run_sync(_read_streaming_body, stream, limiter=_chat_limiter)
 
     reply = text
     raw_obj: Optional[Dict[str, Any]] = None
     try:
-        raw_obj = json.loads(text)
+        raw_obj = orjson.loads(text)
         if isinstance(raw_obj, dict) and "response" in raw_obj:
             reply = str(raw_obj["response"])
     except Exception:
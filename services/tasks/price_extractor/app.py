@@ -11,18 +11,28 @@ DB_HOST = os.environ["DB_HOST"]
 DB_PORT = int(os.environ.get("DB_PORT", "5432"))
 DB_NAME = os.environ.get("DB_NAME", "poke")
 DB_USER = os.environ["DB_USER"]
-DB_PASSWORD = os.environ["DB_PASSWORD"]
+DB_PASSWORD = os.environ.get("DB_PASSWORD")
+DB_IAM_AUTH = os.environ.get("DB_IAM_AUTH") == "1"
 
 SNAPSHOT_DATE = date.today()
 
 
+def db_password():
+    # Via the RDS Proxy (DB_IAM_AUTH=1) the password is a 15-minute IAM token.
+    if not DB_IAM_AUTH:
+        return DB_PASSWORD
+    import boto3
+
+    return boto3.client("rds").generate_db_auth_token(DB_HOST, DB_PORT, DB_USER)
+
+
 def connect():
     conn = psycopg2.connect(
         host=DB_HOST,
         port=DB_PORT,
         dbname=DB_NAME,
         user=DB_USER,
-        password=DB_PASSWORD,
+        password=db_password(),
         connect_timeout=10,
     )
     register_default_jsonb(conn)
@@ -67,6 +77,13 @@ def ensure_tables(conn):
           ON tcgplayer_price_snapshot(asset_id, snapshot_date);
         """
         )
+        # Serves the "latest price per (asset_id, variant)" DISTINCT ON scan.
+        cur.execute(
+            """
+        CREATE INDEX IF NOT EXISTS idx_tcgplayer_price_asset_variant_date
+          ON tcgplayer_price_snapshot(asset_id, variant, snapshot_date DESC);
+        """
+        )
 
         cur.execute(
             """
@@ -103,6 +120,31 @@ def ensure_tables(conn):
           ON cardmarket_price_snapshot(asset_id, snapshot_date);
         """
         )
+        cur.execute(
+            """
+        CREATE INDEX IF NOT EXISTS idx_cardmarket_price_asset_variant_date
+          ON cardmarket_price_snapshot(asset_id, variant, snapshot_date DESC);
+        """
+        )
+        # Trigram index so the data agent's `name ILIKE '%card%'` lookups
+        # don't fall back to a sequential scan.
+        cur.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+        cur.execute(
+            """
+        CREATE INDEX IF NOT EXISTS idx_cardmarket_price_name_trgm
+          ON cardmarket_price_snapshot USING gin (name gin_trgm_ops);
+        """
+        )
+        cur.execute(
+            """
+        CREATE INDEX IF NOT EXISTS idx_cardmarket_price_date
+          ON cardmarket_price_snapshot(snapshot_date);
+        """
+        )
+        # A btree on (name, snapshot_date) can't serve the agent's unanchored
+        # ILIKE (the trigram index above does), so the one an earlier version
+        # created only cost writes.
+        cur.execute("DROP INDEX IF EXISTS idx_cardmarket_price_name_date;")
     conn.commit()
 
 
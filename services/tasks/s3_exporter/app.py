@@ -11,7 +11,8 @@ DB_HOST = os.environ["DB_HOST"]
 DB_PORT = int(os.environ.get("DB_PORT", "5432"))
 DB_NAME = os.environ.get("DB_NAME", "poke")
 DB_USER = os.environ["DB_USER"]
-DB_PASSWORD = os.environ["DB_PASSWORD"]
+DB_PASSWORD = os.environ.get("DB_PASSWORD")
+DB_IAM_AUTH = os.environ.get("DB_IAM_AUTH") == "1"
 
 S3_BUCKET = os.environ["S3_BUCKET"]
 S3_PREFIX = os.environ.get("S3_PREFIX", "snapshots").strip("/")
@@ -26,13 +27,22 @@ TABLES: Dict[str, str] = {
 }
 
 
+def db_password():
+    # Via the RDS Proxy (DB_IAM_AUTH=1) the password is a 15-minute IAM token.
+    if not DB_IAM_AUTH:
+        return DB_PASSWORD
+    import boto3
+
+    return boto3.client("rds").generate_db_auth_token(DB_HOST, DB_PORT, DB_USER)
+
+
 def connect():
     return psycopg2.connect(
         host=DB_HOST,
         port=DB_PORT,
         dbname=DB_NAME,
         user=DB_USER,
-        password=DB_PASSWORD,
+        password=db_password(),
         connect_timeout=10,
     )
 
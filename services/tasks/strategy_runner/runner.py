@@ -10,55 +10,88 @@ DB_HOST = os.environ["DB_HOST"]
 DB_PORT = int(os.environ.get("DB_PORT", "5432"))
 DB_NAME = os.environ.get("DB_NAME", "poke")
 DB_USER = os.environ["DB_USER"]
-DB_PASSWORD = os.environ["DB_PASSWORD"]
+DB_PASSWORD = os.environ.get("DB_PASSWORD")
+DB_IAM_AUTH = os.environ.get("DB_IAM_AUTH") == "1"
 
 STRATEGY_NAME = os.environ.get("STRATEGY_NAME", "baseline_spread")
 STRATEGY_VERSION = os.environ.get("STRATEGY_VERSION", "v1")
 
 
+def db_password():
+    # Via the RDS Proxy (DB_IAM_AUTH=1) the password is a 15-minute IAM token.
+    if not DB_IAM_AUTH:
+        return DB_PASSWORD
+    import boto3
+
+    return boto3.client("rds").generate_db_auth_token(DB_HOST, DB_PORT, DB_USER)
+
+
 def connect():
     return psycopg2.connect(
         host=DB_HOST,
         port=DB_PORT,
         dbname=DB_NAME,
         user=DB_USER,
-        password=DB_PASSWORD,
+        password=db_password(),
         connect_timeout=10,
     )
 
 
+# Valuation output table for strategy results plus its indexes, sent as one
+# multi-statement batch so a cold start costs a single round trip.
+SCHEMA_DDL = """
+CREATE TABLE IF NOT EXISTS valuation_daily (
+    val_date DATE NOT NULL,
+    asset_id TEXT NOT NULL,
+    market_price NUMERIC NOT NULL,
+    smooth_price NUMERIC NOT NULL,
+    forecast_price NUMERIC NOT NULL,
+    gap NUMERIC NOT NULL,
+    gap_pct NUMERIC NOT NULL,
+    confidence NUMERIC NOT NULL DEFAULT 1.0,
+    rationale_json JSONB NOT NULL DEFAULT '{}'::jsonb,
+    strategy_name TEXT NOT NULL,
+    strategy_version TEXT NOT NULL,
+    run_id UUID NOT NULL,
+    ts_created TIMESTAMPTZ NOT NULL DEFAULT now(),
+    PRIMARY KEY (val_date, asset_id, strategy_name, strategy_version)
+);
+
+CREATE INDEX IF NOT EXISTS idx_valuation_daily_gap
+  ON valuation_daily(val_date, gap_pct);
+
+-- The API's strategy-filtered top-k: equality on the leading columns leaves
+-- gap_pct in index order, so ORDER BY gap_pct ASC/DESC LIMIT k stops after k.
+CREATE INDEX IF NOT EXISTS vd_strategy_gap
+  ON valuation_daily(val_date, strategy_name, strategy_version, gap_pct);
+"""
+
+
 def ensure_schema(conn):
     with conn.cursor() as cur:
-        # Valuation output table for strategy results
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS valuation_daily (
-                val_date DATE NOT NULL,
-                asset_id TEXT NOT NULL,
-                market_price NUMERIC NOT NULL,
-                smooth_price NUMERIC NOT NULL,
-                forecast_price NUMERIC NOT NULL,
-                gap NUMERIC NOT NULL,
-                gap_pct NUMERIC NOT NULL,
-                confidence NUMERIC NOT NULL DEFAULT 1.0,
-                rationale_json JSONB NOT NULL DEFAULT '{}'::jsonb,
-                strategy_name TEXT NOT NULL,
-                strategy_version TEXT NOT NULL,
-                run_id UUID NOT NULL,
-                ts_created TIMESTAMPTZ NOT NULL DEFAULT now(),
-                PRIMARY KEY (val_date, asset_id, strategy_name, strategy_version)
-            );
-            """
-        )
-        cur.execute(
-            """
-            CREATE INDEX IF NOT EXISTS idx_valuation_daily_gap
-              ON valuation_daily(val_date, gap_pct);
-            """
-        )
+        cur.execute(SCHEMA_DDL)
     conn.commit()
 
 
+def invalidate_api_cache():
+    """Drop the API's cached valuation responses so the new run is served."""
+    redis_url = os.environ.get("REDIS_URL")
+    if not redis_url:
+        return
+    try:
+        import redis
+    except ImportError:
+        return
+
+    client = redis.Redis.from_url(redis_url, socket_timeout=2)
+    try:
+        keys = list(client.scan_iter(match="val:*", count=500))
+        if keys:
+            client.delete(*keys)
+    except redis.RedisError as exc:
+        print(f"API cache invalidation failed: {exc}")
+
+
 def load_strategy():
     mod = importlib.import_module(f"strategies.{STRATEGY_NAME}")
     if not hasattr(mod, "generate_proposals"):
@@ -89,6 +122,7 @@ def main():
 
         strategy = load_strategy()
         strategy.generate_proposals(context)
+        invalidate_api_cache()
 
         print(
             f"Strategy run complete: {STRATEGY_NAME}@{STRATEGY_VERSION} run_id={run_id}"
@@ -2,7 +2,7 @@ import os
 from collections import defaultdict
 from datetime import date, timedelta
 
-from psycopg2.extras import Json
+from psycopg2.extras import Json, execute_values
 
 DEFAULT_ALPHA = float(os.getenv("SES_ALPHA", "0.2"))
 LOOKBACK_DAYS = int(os.getenv("SES_LOOKBACK_DAYS", "120"))
@@ -109,7 +109,10 @@ def generate_proposals(context: dict) -> list[dict]:
 
     if inserts:
         with conn.cursor() as cur:
-            cur.executemany(
+            # executemany is one round trip per row; execute_values sends
+            # pages of rows as multi-row INSERTs.
+            execute_values(
+                cur,
                 """
                 INSERT INTO valuation_daily(
                     val_date,
@@ -125,7 +128,7 @@ def generate_proposals(context: dict) -> list[dict]:
                     strategy_version,
                     run_id
                 )
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                VALUES %s
                 ON CONFLICT (val_date, asset_id, strategy_name, strategy_version) DO UPDATE SET
                     market_price=EXCLUDED.market_price,
                     smooth_price=EXCLUDED.smooth_price,
@@ -138,6 +141,7 @@ def generate_proposals(context: dict) -> list[dict]:
                     ts_created=now();
                 """,
                 inserts,
+                page_size=1000,
             )
         conn.commit()
 
@@ -11,7 +11,8 @@ DB_HOST = os.environ["DB_HOST"]
 DB_PORT = int(os.environ.get("DB_PORT", "5432"))
 DB_NAME = os.environ.get("DB_NAME", "poke")
 DB_USER = os.environ["DB_USER"]
-DB_PASSWORD = os.environ["DB_PASSWORD"]
+DB_PASSWORD = os.environ.get("DB_PASSWORD")
+DB_IAM_AUTH = os.environ.get("DB_IAM_AUTH") == "1"
 
 PTCG_API_KEY = os.environ.get("PTCG_API_KEY")
 
@@ -32,13 +33,22 @@ SESSION.mount(
 )
 
 
+def db_password():
+    # Via the RDS Proxy (DB_IAM_AUTH=1) the password is a 15-minute IAM token.
+    if not DB_IAM_AUTH:
+        return DB_PASSWORD
+    import boto3
+
+    return boto3.client("rds").generate_db_auth_token(DB_HOST, DB_PORT, DB_USER)
+
+
 def connect():
     return psycopg2.connect(
         host=DB_HOST,
         port=DB_PORT,
         dbname=DB_NAME,
         user=DB_USER,
-        password=DB_PASSWORD,
+        password=db_password(),
         connect_timeout=10,
     )
 
@@ -87,6 +97,18 @@ def ensure_schema(conn):
           ON card_metadata(asset_id, snapshot_date DESC);
         """
         )
+        # Serves "latest snapshot per asset" lookups (skip scan in
+        # notebooks/db_queries_catalog.py and the API's DISTINCT ON) as
+        # index-only probes. Supersedes card_metadata_asset_date_idx, which
+        # lacked artist.
+        cur.execute(
+            """
+        CREATE INDEX IF NOT EXISTS cm_asset_latest
+          ON card_metadata(asset_id, snapshot_date DESC, updated_ts DESC)
+          INCLUDE (name, artist, rarity, set_name);
+        DROP INDEX IF EXISTS card_metadata_asset_date_idx;
+        """
+        )
     conn.commit()
 
 